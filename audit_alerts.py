@@ -0,0 +1,226 @@
+"""Threshold alerts for pending submissions, updated incrementally per sync.
+
+Every paper whose review clock has started (third review posted) gets one
+deadline per threshold (28/35/42 days) in a min-heap. A sync keeps only the
+submissions with a note or reply created since the previous sync (a scan of
+the reply timestamps) and builds a `Timeline` of those alone: new third
+reviews push deadlines, new decisions are recorded, and deadlines that have
+passed are popped off the heap. A popped deadline becomes an `overdue` alert
+unless the paper was decided before it; each new decision also yields a
+`decided` event with its gap. Loading the venue is still a full read, but
+extraction, sorting and the heap work are O(changes * log n), with no
+rescan of pending papers.
+
+The watermark is the latest creation time seen. Release events are stamped
+at their (possibly future) odate, so they do not move it.
+
+State (heap, clock starts, decisions, watermark) is kept in a JSON
+file between runs. The first sync seeds the heap from the whole history and
+drops the alerts that are already due, unless `--backfill` is given.
+Alerts are appended to a JSONL file and/or POSTed to a webhook;
+`audit_alerts.py listen` is a local webhook stand-in.
+
+Usage:
+    python audit_alerts.py run --snapshots snapshots --state alerts/state.json --out alerts/alerts.jsonl
+    python audit_alerts.py run --snapshots snapshots --refresh --watch 3600 --webhook http://127.0.0.1:8060/
+    python audit_alerts.py listen --port 8060 --out alerts/received.jsonl
+"""
+import argparse
+import heapq
+import json
+import os
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from audit_asof import to_ms
+from audit_engine import DECISION, MS_PER_DAY, RELEASE, REVIEW, THRESHOLDS, VENUES, load_notes, note_to_dict
+from audit_timeline import Timeline
+
+
+def _iso(ms):
+    return pd.Timestamp(int(ms), unit='ms').isoformat()
+
+
+class ThresholdAlerts:
+    """Min-heap of (deadline, paper id, threshold) for papers with a running review clock."""
+
+    def __init__(self, thresholds=THRESHOLDS, venue='TMLR'):
+        self.thresholds = list(thresholds)
+        self.venue = venue
+        self.last_cdate = None
+        self.heap = []
+        self.clock = {}      # id -> third-review time (ms)
+        self.decided = {}    # id -> decision time (ms)
+
+    @classmethod
+    def load(cls, path, thresholds=THRESHOLDS, venue='TMLR'):
+        alerts = cls(thresholds, venue)
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state['thresholds'] == alerts.thresholds and state['venue'] == venue:
+                alerts.last_cdate = state['last_cdate']
+                alerts.heap = [tuple(e) for e in state['heap']]
+                alerts.clock = state['clock']
+                alerts.decided = state['decided']
+        return alerts
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'venue': self.venue, 'thresholds': self.thresholds, 'last_cdate': self.last_cdate,
+                       'heap': self.heap, 'clock': self.clock, 'decided': self.decided}, f)
+        os.replace(tmp, path)
+
+    def _decided_event(self, pid, t_decision):
+        event = {'event': 'decided', 'venue': self.venue, 'id': pid, 't_decision': _iso(t_decision)}
+        t3 = self.clock.get(pid)
+        if t3 is not None:
+            gap = (t_decision - t3) / MS_PER_DAY
+            event.update({'t_third_review': _iso(t3), 'gap_days': round(gap, 2),
+                          'exceeded': [t for t in self.thresholds if gap > t]})
+        return event
+
+    def update(self, timeline, now):
+        """Apply the events created since the last update and pop deadlines up to `now` (ms).
+
+        `timeline` may hold the whole venue or only the changed submissions
+        (see `changed_notes`). Returns the alert events in time order.
+        """
+        created = timeline.type != RELEASE
+        new = created if self.last_cdate is None else created & (timeline.cdate > self.last_cdate)
+        events = []
+        for p in np.unique(timeline.paper[new]):
+            pid = str(timeline.ids[p])
+            n_reviews, n_decisions = timeline.counts[p, REVIEW], timeline.counts[p, DECISION]
+            if pid not in self.clock and n_reviews >= 3:
+                t3 = int(timeline.cdate[timeline.block_start[p, REVIEW] + 2])
+                self.clock[pid] = t3
+                for t in self.thresholds:
+                    heapq.heappush(self.heap, (t3 + t * MS_PER_DAY, pid, t))
+            if pid not in self.decided and n_decisions:
+                self.decided[pid] = int(timeline.cdate[timeline.block_start[p, DECISION]])
+                events.append((self.decided[pid], self._decided_event(pid, self.decided[pid])))
+        if new.any():
+            self.last_cdate = int(timeline.cdate[new].max())
+
+        while self.heap and self.heap[0][0] <= now:
+            deadline, pid, t = heapq.heappop(self.heap)
+            t_decision = self.decided.get(pid)
+            if t_decision is not None and t_decision <= deadline:
+                continue
+            events.append((deadline, {'event': 'overdue', 'venue': self.venue, 'id': pid, 'threshold_days': t,
+                                      't_third_review': _iso(self.clock[pid]), 'deadline': _iso(deadline),
+                                      'decided': t_decision is not None}))
+        events.sort(key=lambda e: e[0])
+        return [e for _, e in events]
+
+
+def emit(events, out=None, webhook=None):
+    """Append events to a JSONL file and/or POST them as one JSON array to a webhook."""
+    if not events:
+        return
+    if out:
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        with open(out, 'a') as f:
+            for e in events:
+                f.write(json.dumps(e) + '\n')
+    if webhook:
+        req = urllib.request.Request(webhook, data=json.dumps(events).encode(),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+
+
+def changed_notes(notes, since):
+    """Submissions with a note or reply created after `since` (ms); all of them when `since` is None."""
+    if since is None:
+        return list(notes)
+    changed = []
+    for note in notes:
+        d = note_to_dict(note)
+        replies = (d.get('details') or {}).get('replies', [])
+        if (d.get('cdate') or 0) > since or any((r.get('cdate') or 0) > since for r in replies):
+            changed.append(note)
+    return changed
+
+
+def sync_once(alerts, venue, snapshot_root, refresh=False, now=None, backfill=False):
+    """Load the venue, update `alerts` from the changed submissions and return the events to emit."""
+    notes = changed_notes(load_notes(venue, snapshot_root=snapshot_root, refresh=refresh), alerts.last_cdate)
+    first = alerts.last_cdate is None
+    events = alerts.update(Timeline.from_notes(notes, venue), now if now is not None else int(time.time() * 1000))
+    return events if backfill or not first else []
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    out = None
+    _lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        events = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+        with self._lock:
+            for e in events:
+                print(f"  {e['event']:<8} {e['id']} " + (f"> {e['threshold_days']}d since {e['t_third_review']}"
+                                                         if e['event'] == 'overdue' else f"at {e['t_decision']}"))
+            if self.out:
+                emit(events, out=self.out)
+        self.send_response(204)
+        self.end_headers()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_run = sub.add_parser('run', help='Sync once (or every --watch seconds) and emit new alerts')
+    p_run.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    p_run.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    p_run.add_argument('--refresh', action='store_true', help='Re-fetch the snapshot on every sync')
+    p_run.add_argument('--state', default='alerts/state.json', help='Alert state file')
+    p_run.add_argument('--out', help='Append alerts to this JSONL file')
+    p_run.add_argument('--webhook', help='POST alerts to this URL')
+    p_run.add_argument('--thresholds', default=','.join(map(str, THRESHOLDS)), help='Comma-separated days')
+    p_run.add_argument('--now', help='Evaluate deadlines as of this date (end of day) or instant instead of '
+                                     'the current time')
+    p_run.add_argument('--backfill', action='store_true', help='On the first sync, emit alerts already due')
+    p_run.add_argument('--watch', type=float, metavar='SECONDS', help='Keep syncing at this interval')
+    p_listen = sub.add_parser('listen', help='Local webhook stand-in that prints (and stores) received alerts')
+    p_listen.add_argument('--host', default='127.0.0.1')
+    p_listen.add_argument('--port', type=int, default=8060)
+    p_listen.add_argument('--out', help='Append received alerts to this JSONL file')
+    args = parser.parse_args()
+
+    if args.command == 'listen':
+        handler = type('WebhookHandler', (_WebhookHandler,), {'out': args.out})
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        print(f"Listening for alerts at http://{args.host}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        venue = VENUES[args.venue]
+        thresholds = [int(t) for t in args.thresholds.split(',')]
+        alerts = ThresholdAlerts.load(args.state, thresholds, venue.key)
+        now = to_ms(args.now) if args.now else None
+        while True:
+            events = sync_once(alerts, venue, args.snapshots, refresh=args.refresh, now=now, backfill=args.backfill)
+            alerts.save(args.state)
+            emit(events, out=args.out, webhook=args.webhook)
+            counts = pd.Series([e['event'] for e in events], dtype=object).value_counts()
+            print(f"{pd.Timestamp.now().isoformat(timespec='seconds')} synced: "
+                  f"{counts.get('overdue', 0)} overdue, {counts.get('decided', 0)} decided, "
+                  f"{len(alerts.heap)} deadlines pending")
+            if not args.watch:
+                break
+            args.backfill = False
+            time.sleep(args.watch)
@@ -0,0 +1,145 @@
+"""Point-in-time ("as of") replay of the decision-timeline audit.
+
+Given an as-of timestamp, every event after it is treated as unseen: papers
+not yet submitted drop out, reviews and decisions posted later disappear, and
+papers without a visible decision become censored. The per-paper records are
+rebuilt from the venue's `Timeline` (see audit_timeline.py), so a cut is one
+binary search over the sorted event timestamps, and a sweep over weekly
+as-of dates only adds the events that became visible since the previous date.
+
+Usage:
+    python audit_asof.py --snapshots snapshots --as-of 2025-02-06
+    python audit_asof.py --snapshots snapshots --sweep --since 2023-01-01 --csv asof_drift.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import (DECISION, MS_PER_DAY, NO_OUTCOME, REVIEW, SUBMISSION, THRESHOLDS, VENUES,
+                          analysis_frame, extract_events, extract_records, load_notes, records_frame)
+from audit_timeline import Timeline
+
+
+def to_ms(date):
+    """'2025-02-06' (or any numpy datetime string) -> epoch milliseconds at the end of that day/instant."""
+    t = np.datetime64(date, 'ms')
+    if len(date) <= 10:
+        t += np.timedelta64(1, 'D') - np.timedelta64(1, 'ms')
+    return int(t.astype(np.int64))
+
+
+def records_as_of(view, df):
+    """Records table as the audit would have built it from `view` (a `Timeline.as_of` view).
+
+    `df` is the current records table for the same papers (same row order);
+    only the decision recommendation and outcome are taken from it, and only
+    for papers whose decision is already visible.
+    """
+    seen = view.count(SUBMISSION) > 0
+    t_decision = view.first(DECISION)
+    censored = np.isnan(t_decision)
+    out = pd.DataFrame({
+        'venue': df['venue'].to_numpy(),
+        'id': view.ids,
+        'n_reviews': view.count(REVIEW),
+        't_third_review': view.kth(REVIEW, 3),
+        't_decision': t_decision,
+        'censored': censored,
+        'recommendation': np.where(censored, '', df['recommendation'].to_numpy()),
+        'outcome': np.where(censored, NO_OUTCOME, df['outcome'].to_numpy()).astype(np.int8),
+    })[seen].reset_index(drop=True)
+    out['gap_days'] = (out['t_decision'] - out['t_third_review']) / MS_PER_DAY
+    return out
+
+
+def sweep(timeline, times):
+    """Yield `(t, view)` for increasing as-of times `t` (ms).
+
+    Counts are carried from one date to the next: each step binary-searches
+    the sorted timestamps and bincounts only the newly visible events.
+    """
+    order, sorted_cdate = timeline.time_order()
+    counts = np.zeros(timeline.counts.size, dtype=np.int64)
+    seen = 0
+    for t in times:
+        n = np.searchsorted(sorted_cdate, t, side='right')
+        counts += np.bincount(timeline.block_key[order[seen:n]], minlength=counts.size)
+        seen = n
+        yield t, timeline.with_counts(counts.reshape(timeline.counts.shape).copy())
+
+
+def drift_row(t, df, thresholds=THRESHOLDS):
+    """Headline statistics of one as-of records table."""
+    gaps = analysis_frame(df)['gap_days']
+    row = {'as_of': pd.to_datetime(t, unit='ms').date(), 'submissions': len(df), 'n': len(gaps),
+           'censored': int(df['censored'].sum())}
+    for q in [0.5, 0.9]:
+        row[f'p{int(q * 100)}'] = gaps.quantile(q) if len(gaps) else np.nan
+    for th in thresholds:
+        row[f'share_gt_{th}'] = (gaps > th).mean() if len(gaps) else np.nan
+    return row
+
+
+def drift_table(timeline, df, times, thresholds=THRESHOLDS):
+    return pd.DataFrame([drift_row(t, records_as_of(view, df), thresholds) for t, view in sweep(timeline, times)])
+
+
+def weekly_times(timeline, since=None, until=None):
+    """Weekly as-of times from `since` (default: first event) to `until` (default: last event)."""
+    _, sorted_cdate = timeline.time_order()
+    start = to_ms(since) if since else int(sorted_cdate[0])
+    end = to_ms(until) if until else int(sorted_cdate[-1])
+    week = 7 * MS_PER_DAY
+    return np.append(np.arange(start, end, week), end)
+
+
+def print_drift_table(drift, thresholds=THRESHOLDS):
+    print(f"\n=== As-Of Drift ({len(drift)} dates) ===")
+    header = f"{'As of':<11} {'Subs':>6} {'N':>6} {'Cens.':>6} {'Median':>7} {'90th':>6}"
+    header += ''.join(f" {'>' + str(t) + 'd':>6}" for t in thresholds)
+    print(header)
+    for _, row in drift.iterrows():
+        line = (f"{str(row['as_of']):<11} {row['submissions']:>6} {row['n']:>6} {row['censored']:>6} "
+                f"{row['p50']:>7.1f} {row['p90']:>6.1f}")
+        line += ''.join(f" {row[f'share_gt_{t}'] * 100:>5.1f}%" for t in thresholds)
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--as-of', help='Report as of this date or timestamp (default: latest event)')
+    parser.add_argument('--plots', metavar='DIR', help='Also write the report figures for --as-of into DIR')
+    parser.add_argument('--sweep', action='store_true', help='Report weekly as-of statistics instead')
+    parser.add_argument('--since', help='First as-of date of the sweep (default: first event)')
+    parser.add_argument('--until', help='Last as-of date of the sweep (default: latest event)')
+    parser.add_argument('--csv', help='Write the sweep table to this CSV')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    notes = load_notes(venue, snapshot_root=args.snapshots)
+    df = records_frame(extract_records(notes, venue))
+    timeline = Timeline.from_events(extract_events(notes, venue), df['id'].to_numpy(dtype=object))
+
+    if args.sweep:
+        drift = drift_table(timeline, df, weekly_times(timeline, args.since, args.until))
+        print_drift_table(drift)
+        if args.csv:
+            os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+            drift.to_csv(args.csv, index=False)
+    else:
+        import tmlr_audit
+
+        t = to_ms(args.as_of) if args.as_of else int(timeline.time_order()[1][-1])
+        past = records_as_of(timeline.as_of(t), df)
+        analysis = analysis_frame(past)
+        print(f"As of {pd.to_datetime(t, unit='ms')}: {len(past)} submissions")
+        tmlr_audit.print_audit_statistics(past, analysis)
+        if args.plots:
+            os.makedirs(args.plots, exist_ok=True)
+            tmlr_audit.plot_histogram(analysis, args.plots)
+            tmlr_audit.plot_yearly(analysis, args.plots)
+            tmlr_audit.plot_rejection_by_wait(analysis, args.plots)
@@ -0,0 +1,100 @@
+"""Every baseline/endpoint variant of the audit gap from one extraction.
+
+The replications in `tmlr_experiment/` differ mostly in which clock they
+measure: from submission, the first, third or last review, or the review
+release, to the earliest or the latest decision. All of these are
+milestones of the venue's `Timeline`, built from a single pass over the
+replies, so each variant is one array subtraction. The sensitivity report
+puts their N, quantiles and compliance side by side, with and without the
+three-review requirement of the main audit.
+
+Usage:
+    python audit_baselines.py --snapshots snapshots
+    python audit_baselines.py --snapshots snapshots --thresholds 28,35 --csv baseline_gaps.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_compliance import parse_thresholds
+from audit_engine import DECISION, MS_PER_DAY, RELEASE, REVIEW, SUBMISSION, THRESHOLDS, VENUES, load_notes
+from audit_timeline import Timeline
+
+BASELINES = [
+    ('submission', (SUBMISSION, 1)),
+    ('first_review', (REVIEW, 1)),
+    ('third_review', (REVIEW, 3)),
+    ('last_review', (REVIEW, -1)),
+    ('review_release', (RELEASE, 1)),
+]
+ENDPOINTS = [
+    ('first_decision', (DECISION, 1)),
+    ('last_decision', (DECISION, -1)),
+]
+# The main audit: third review -> earliest decision, papers with >= 3 reviews
+CANONICAL = ('third_review', 'first_decision', True)
+
+
+def baseline_gaps(timeline):
+    """Per-paper gap in days for every (baseline, endpoint) pair, as `<baseline>__<endpoint>` columns."""
+    out = {'id': timeline.ids, 'n_reviews': timeline.count(REVIEW)}
+    ends = {name: timeline.kth(etype, k) for name, (etype, k) in ENDPOINTS}
+    for b_name, (b_type, b_k) in BASELINES:
+        start = timeline.kth(b_type, b_k)
+        for e_name, _ in ENDPOINTS:
+            out[f'{b_name}__{e_name}'] = (ends[e_name] - start) / MS_PER_DAY
+    return pd.DataFrame(out)
+
+
+def sensitivity(gaps, thresholds=THRESHOLDS):
+    """N, quantiles and share above each threshold for every variant.
+
+    Each pair is reported over all papers with both events and over papers
+    with at least three reviews; negative gaps are dropped as in the audit.
+    """
+    rows = []
+    three = gaps['n_reviews'].to_numpy() >= 3
+    for b_name, _ in BASELINES:
+        for e_name, _ in ENDPOINTS:
+            col = gaps[f'{b_name}__{e_name}'].to_numpy()
+            for require_three in (True, False):
+                g = np.sort(col[~np.isnan(col) & (col >= 0) & (three if require_three else True)])
+                row = {'baseline': b_name, 'endpoint': e_name, 'min_3_reviews': require_three, 'n': len(g)}
+                quantiles = np.percentile(g, [50, 75, 90]) if len(g) else [np.nan] * 3
+                shares = (len(g) - np.searchsorted(g, thresholds, side='right')) / max(len(g), 1)
+                row.update({f'p{q}': v for q, v in zip([50, 75, 90], quantiles)})
+                row.update({f'share_gt_{t}': s if len(g) else np.nan for t, s in zip(thresholds, shares)})
+                rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def print_sensitivity_report(report, thresholds=THRESHOLDS):
+    print(f"\n=== Baseline Sensitivity (* = main audit) ===")
+    header = f"{'Baseline':<16} {'Endpoint':<15} {'3+':>3} {'N':>6} {'Median':>7} {'75th':>6} {'90th':>6}"
+    print(header + ''.join(f" {'>' + str(t) + 'd':>6}" for t in thresholds))
+    for _, row in report.iterrows():
+        mark = '*' if (row['baseline'], row['endpoint'], row['min_3_reviews']) == CANONICAL else ' '
+        line = (f"{row['baseline']:<16} {row['endpoint']:<15} {'yes' if row['min_3_reviews'] else 'no':>3} "
+                f"{row['n']:>6} {row['p50']:>7.1f} {row['p75']:>6.1f} {row['p90']:>6.1f}")
+        print(line + ''.join(f" {row[f'share_gt_{t}'] * 100:>5.1f}%" for t in thresholds) + mark)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--thresholds', default=','.join(map(str, THRESHOLDS)),
+                        help='Comma-separated day thresholds (default: %(default)s)')
+    parser.add_argument('--csv', help='Write the per-paper gap of every variant to this CSV')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    timeline = Timeline.from_notes(load_notes(venue, snapshot_root=args.snapshots), venue)
+    gaps = baseline_gaps(timeline)
+    thresholds = parse_thresholds(args.thresholds)
+    print_sensitivity_report(sensitivity(gaps, thresholds), thresholds)
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+        gaps.to_csv(args.csv, index=False)
@@ -0,0 +1,143 @@
+"""Calendar-aware gap definitions: business days, with and without holidays.
+
+`gap_days` counts raw calendar time, so a wait over the December break or a
+few weekends looks as long as one of working days. This module recomputes
+every analysis gap as
+
+    calendar_days       the audit's gap (fractional days)
+    business_days       weekdays from the third-review date (inclusive) to the decision date (exclusive)
+    working_days        business days that are also not in the holiday calendar
+
+with one `numpy.busday_count` call over all papers, and reports quantiles and
+compliance under each definition. Thresholds are given in weeks and become
+7 days per week for calendar gaps and 5 for the two business-day gaps.
+
+The holiday calendar is a list of yearly ranges ('12-24:01-01', the default
+winter break) and/or single dates ('2024-07-04'); dates are taken in UTC.
+
+Usage:
+    python audit_calendar.py --snapshots snapshots
+    python audit_calendar.py --snapshots snapshots --holidays 12-24:01-01,08-01:08-15 --weeks 4,5,6 --csv gaps.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_compliance import ComplianceIndex
+from audit_engine import VENUES, analysis_frame, audit_venue
+
+DEFAULT_HOLIDAYS = '12-24:01-01'
+DEFINITIONS = [('calendar_days', 7), ('business_days', 5), ('working_days', 5)]
+
+
+def _yearly(year, month_day, roll):
+    """datetime64[D] of 'MM-DD' in `year`; a day the year lacks (02-29) rolls `forward`/`back`, or is None."""
+    month = np.datetime64(f'{year}-{month_day[:2]}')
+    next_month = (month + np.timedelta64(1, 'M')).astype('datetime64[D]')
+    day = month.astype('datetime64[D]') + int(month_day[3:]) - 1
+    if day < next_month:
+        return day
+    return {'forward': next_month, 'back': next_month - 1}.get(roll)
+
+
+def _invalid(part):
+    return ValueError(f"invalid holiday '{part}': expected MM-DD:MM-DD, MM-DD or YYYY-MM-DD")
+
+
+def _check_month_day(part, month_day):
+    try:
+        np.datetime64(f'2000-{month_day}')  # a leap year accepts every real month and day
+    except ValueError:
+        raise _invalid(part) from None
+    if len(month_day) != 5:
+        raise _invalid(part)
+
+
+def holiday_calendar(spec, years):
+    """Sorted unique datetime64[D] holidays for `years` from a spec like '12-24:01-01,2024-07-04'.
+
+    A yearly date a year lacks (02-29) is skipped in that year; raises
+    ValueError on a malformed spec.
+    """
+    days = []
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        if ':' in part:
+            start, _, end = part.partition(':')
+            _check_month_day(part, start)
+            _check_month_day(part, end)
+            for y in years:
+                # A range that wraps the new year starts in the previous year
+                first = _yearly(y - (end < start), start, 'forward')
+                days.append(np.arange(first, _yearly(y, end, 'back') + 1))
+        elif len(part) == 5:
+            _check_month_day(part, part)
+            dates = [_yearly(y, part, None) for y in years]
+            days.append(np.array([d for d in dates if d is not None], dtype='datetime64[D]'))
+        else:
+            try:
+                days.append(np.array([np.datetime64(part, 'D')]))
+            except ValueError:
+                raise _invalid(part) from None
+    return np.unique(np.concatenate(days)) if days else np.array([], dtype='datetime64[D]')
+
+
+def calendar_gaps(analysis, holidays=DEFAULT_HOLIDAYS):
+    """Per-paper gap under every definition in DEFINITIONS (same row order as `analysis`)."""
+    start = analysis['t_third_review'].to_numpy(dtype=np.int64).astype('datetime64[ms]').astype('datetime64[D]')
+    end = analysis['t_decision'].to_numpy(dtype=np.int64).astype('datetime64[ms]').astype('datetime64[D]')
+    years = range(start.min().astype(object).year, end.max().astype(object).year + 2) if len(start) else []
+    return pd.DataFrame({
+        'id': analysis['id'].to_numpy(),
+        'calendar_days': analysis['gap_days'].to_numpy(dtype=float),
+        'business_days': np.busday_count(start, end),
+        'working_days': np.busday_count(start, end, holidays=holiday_calendar(holidays, years)),
+    }, index=analysis.index)
+
+
+def definition_summary(analysis, gaps, weeks=(4, 5, 6)):
+    """N, quantiles and share above each week threshold, one row per gap definition."""
+    rows = []
+    for name, days_per_week in DEFINITIONS:
+        index = ComplianceIndex.from_analysis(analysis.assign(gap_days=gaps[name].astype(float)))
+        row = {'definition': name, 'n': index.count()}
+        row.update({f'p{q}': v for q, v in zip([50, 75, 90], index.quantile([0.5, 0.75, 0.9]))})
+        shares = index.share_above([w * days_per_week for w in weeks])
+        row.update({f'share_gt_{w}w': s for w, s in zip(weeks, shares)})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def print_definition_summary(summary, weeks=(4, 5, 6)):
+    print(f"\n=== Gap Definitions (thresholds in weeks: 7 calendar or 5 business days each) ===")
+    header = f"{'Definition':<14} {'N':>6} {'Median':>7} {'75th':>6} {'90th':>6}"
+    print(header + ''.join(f" {'>' + str(w) + 'w':>6}" for w in weeks))
+    for _, row in summary.iterrows():
+        line = f"{row['definition']:<14} {row['n']:>6} {row['p50']:>7.1f} {row['p75']:>6.1f} {row['p90']:>6.1f}"
+        print(line + ''.join(f" {row[f'share_gt_{w}w'] * 100:>5.1f}%" for w in weeks))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--holidays', default=DEFAULT_HOLIDAYS,
+                        help="Comma-separated yearly ranges 'MM-DD:MM-DD', yearly dates 'MM-DD' or dates "
+                             "'YYYY-MM-DD' (default: %(default)s; '' for none)")
+    parser.add_argument('--weeks', default='4,5,6', help='Comma-separated week thresholds (default: %(default)s)')
+    parser.add_argument('--csv', help='Write the per-paper gaps under every definition to this CSV')
+    args = parser.parse_args()
+
+    try:
+        holiday_calendar(args.holidays, [2000])
+    except ValueError as e:
+        parser.error(f'--holidays: {e}')
+    weeks = [int(w) for w in args.weeks.split(',')]
+
+    analysis = analysis_frame(audit_venue(VENUES[args.venue], snapshot_root=args.snapshots))
+    gaps = calendar_gaps(analysis, args.holidays)
+    print_definition_summary(definition_summary(analysis, gaps, weeks), weeks)
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+        gaps.to_csv(args.csv, index=False)
@@ -0,0 +1,203 @@
+"""Cohort x gap count grid for seasonal views of the decision delay.
+
+Papers are binned by the week or month of their third review (the cohort)
+and by their gap in whole days: bin k holds gaps in (k-1, k], bin 0 exact
+zeros, and the last bin everything beyond `max_days`. The grid is filled
+with one `bincount` pass. Per-cohort quantiles and compliance shares are
+then read off cumulative sums along the gap axis (quantiles at rank
+q*(n-1), as `np.percentile`, with each paper placed within its day), and
+prefix sums along the cohort axis give any contiguous range of cohorts (a
+quarter, a year) as one subtraction, without regrouping papers.
+
+The grid only grows: `update` adds the decisions not seen before (by id), so
+a saved grid can be brought up to date after each sync.
+
+Usage:
+    python audit_cohorts.py --snapshots snapshots --period month
+    python audit_cohorts.py --snapshots snapshots --period week --state images/cohorts_week.npz --csv cohorts.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import MS_PER_DAY, VENUES, analysis_frame, audit_venue
+
+PERIODS = ('month', 'week')
+
+
+def period_index(t_ms, period):
+    """Months since 1970-01, or weeks since Monday 1969-12-29, of each timestamp (ms)."""
+    t = np.asarray(t_ms, dtype=np.int64)
+    if period == 'month':
+        return t.astype('datetime64[ms]').astype('datetime64[M]').astype(np.int64)
+    return (t // MS_PER_DAY + 3) // 7
+
+
+class CohortGrid:
+    """`counts[c, k]`: papers of cohort `start + c` whose gap falls in day bin k."""
+
+    def __init__(self, period='month', max_days=180):
+        if period not in PERIODS:
+            raise ValueError(f'period must be one of {PERIODS}')
+        self.period = period
+        self.max_days = max_days
+        self.start = None
+        self.counts = np.zeros((0, max_days + 2), dtype=np.int64)
+        self.ids = np.array([], dtype=object)
+        self._prefix = None
+
+    def add(self, t_third_review, gap_days):
+        """Count papers by third-review time (ms) and gap (days)."""
+        if not len(gap_days):
+            return
+        cohort = period_index(t_third_review, self.period)
+        gap_bin = np.clip(np.ceil(np.asarray(gap_days, dtype=float)), 0, self.max_days + 1).astype(np.int64)
+        lo, hi = cohort.min(), cohort.max()
+        if self.start is None:
+            self.start = lo
+        # Grow the cohort axis to cover the new papers
+        before = max(self.start - lo, 0)
+        after = max(hi - (self.start + len(self.counts) - 1), 0)
+        if before or after:
+            self.counts = np.pad(self.counts, ((before, after), (0, 0)))
+            self.start -= before
+        width = self.counts.shape[1]
+        flat = (cohort - self.start) * width + gap_bin
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self._prefix = None
+
+    def update(self, analysis):
+        """Add the analysis rows whose id is not in the grid yet; returns how many were added."""
+        ids = analysis['id'].to_numpy(dtype=object)
+        new = ~np.isin(ids, self.ids)
+        self.add(analysis['t_third_review'].to_numpy()[new], analysis['gap_days'].to_numpy()[new])
+        self.ids = np.concatenate([self.ids, ids[new]])
+        return int(new.sum())
+
+    @classmethod
+    def from_analysis(cls, analysis, period='month', max_days=180):
+        grid = cls(period, max_days)
+        grid.update(analysis)
+        return grid
+
+    def save(self, path):
+        np.savez_compressed(path, counts=self.counts, ids=self.ids.astype(str),
+                            meta=np.array([self.period, self.max_days, -1 if self.start is None else self.start],
+                                          dtype=object).astype(str))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            period, max_days, start = z['meta']
+            grid = cls(str(period), int(max_days))
+            grid.counts = z['counts']
+            grid.ids = z['ids'].astype(object)
+            grid.start = None if int(start) < 0 else int(start)
+        return grid
+
+    def labels(self):
+        """Cohort labels: 'YYYY-MM' for months, the Monday's date for weeks."""
+        k = self.start + np.arange(len(self.counts)) if self.start is not None else np.array([], dtype=np.int64)
+        if self.period == 'month':
+            return k.astype('datetime64[M]').astype(str)
+        return (k * 7 - 3).astype('datetime64[D]').astype(str)
+
+    def range_counts(self, first, last):
+        """Gap histogram of cohorts `first..last` (row positions, inclusive) from prefix sums."""
+        if self._prefix is None:
+            self._prefix = np.vstack([np.zeros((1, self.counts.shape[1]), dtype=np.int64),
+                                      np.cumsum(self.counts, axis=0)])
+        return self._prefix[last + 1] - self._prefix[first]
+
+    @staticmethod
+    def _rank_value(counts, cum, rank):
+        """Gap of the paper at 0-based `rank` in each row, its bin's papers spread evenly across the bin."""
+        last = counts.shape[1] - 1
+        k = np.minimum((cum <= rank[:, None]).sum(axis=1), last)
+        rows = np.arange(len(counts))
+        below = np.where(k > 0, cum[rows, k - 1], 0)
+        inside = np.maximum(counts[rows, k], 1)
+        value = np.where(k == 0, 0.0, k - 1 + (rank - below + 0.5) / inside)
+        value[k == last] = np.inf  # beyond max_days
+        return value
+
+    @classmethod
+    def _quantile(cls, counts, q):
+        """Quantile `q` of each row of a day-bin histogram.
+
+        Like `np.percentile`'s default, the quantile sits at rank q*(n-1) and is
+        interpolated between the papers at the floor and ceiling ranks; each
+        paper's gap is placed within its day bin.
+        """
+        counts = np.atleast_2d(counts)
+        cum = np.cumsum(counts, axis=1)
+        n = cum[:, -1]
+        rank = q * np.maximum(n - 1, 0)
+        lo = np.floor(rank)
+        frac = rank - lo
+        v_lo = cls._rank_value(counts, cum, lo)
+        v_hi = cls._rank_value(counts, cum, np.minimum(lo + 1, np.maximum(n - 1, 0)))
+        with np.errstate(invalid='ignore'):
+            value = np.where(np.isfinite(v_hi), v_lo + frac * (v_hi - v_lo), np.where(frac > 0, np.inf, v_lo))
+        value[n == 0] = np.nan
+        return value
+
+    def quantile(self, q, counts=None):
+        """Per-cohort quantile of the gap (or of the rows of `counts`)."""
+        return self._quantile(self.counts if counts is None else counts, q)
+
+    def share_above(self, days, counts=None):
+        """Per-cohort share of gaps strictly above `days` (whole days <= max_days)."""
+        counts = np.atleast_2d(self.counts if counts is None else counts)
+        cum = np.cumsum(counts, axis=1)
+        n = cum[:, -1]
+        return np.divide(n - cum[:, int(days)], n, out=np.full(len(n), np.nan), where=n > 0)
+
+    def table(self, thresholds=(28, 35, 42)):
+        out = pd.DataFrame({'cohort': self.labels(), 'n': self.counts.sum(axis=1)})
+        for q in (0.5, 0.75, 0.9):
+            out[f'p{int(q * 100)}'] = self.quantile(q)
+        for t in thresholds:
+            out[f'share_gt_{t}'] = self.share_above(t)
+        return out
+
+
+def print_cohort_table(grid, min_n=5, thresholds=(28, 35, 42)):
+    table = grid.table(thresholds)
+    print(f"\n=== Decision Delay by Third-Review {grid.period.title()} (cohorts with N >= {min_n}) ===")
+    header = f"{'Cohort':<11} {'N':>5} {'Median':>7} {'75th':>6} {'90th':>6}"
+    print(header + ''.join(f" {'>' + str(t) + 'd':>6}" for t in thresholds))
+    for _, row in table[table['n'] >= min_n].iterrows():
+        line = f"{row['cohort']:<11} {row['n']:>5} {row['p50']:>7.1f} {row['p75']:>6.1f} {row['p90']:>6.1f}"
+        print(line + ''.join(f" {row[f'share_gt_{t}'] * 100:>5.1f}%" for t in thresholds))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--period', default='month', choices=PERIODS)
+    parser.add_argument('--max-days', type=int, default=180, help='Last whole-day gap bin (default: %(default)s)')
+    parser.add_argument('--min-n', type=int, default=5, help='Smallest cohort to print')
+    parser.add_argument('--state', help='Load the grid from this .npz, add new decisions only, and save it back')
+    parser.add_argument('--csv', help='Write the per-cohort table to this CSV')
+    args = parser.parse_args()
+
+    analysis = analysis_frame(audit_venue(VENUES[args.venue], snapshot_root=args.snapshots))
+    if args.state and os.path.exists(args.state):
+        grid = CohortGrid.load(args.state)
+        if grid.period != args.period or grid.max_days != args.max_days:
+            parser.error(f'{args.state} holds a {grid.period} grid with max_days={grid.max_days}')
+    else:
+        grid = CohortGrid(args.period, args.max_days)
+    added = grid.update(analysis)
+    print(f"{added} new decisions added ({len(grid.ids)} in the grid)")
+    print_cohort_table(grid, args.min_n)
+    if args.state:
+        os.makedirs(os.path.dirname(args.state) or '.', exist_ok=True)
+        grid.save(args.state)
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+        grid.table().to_csv(args.csv, index=False)
@@ -0,0 +1,120 @@
+"""Sorted-gap index for compliance queries at arbitrary thresholds.
+
+The analysis gaps are sorted once, grouped by cohort (all decisions, each
+decision year and each outcome class) into one flat array with per-cohort
+offsets. "Share of decisions taking more than T days" is then a binary search
+in the cohort's slice, and a whole compliance curve (every day 0-200, say)
+is a single vectorized `searchsorted`.
+
+Usage:
+    python audit_compliance.py --snapshots snapshots --thresholds 21,28,35,42,56
+    python audit_compliance.py --snapshots snapshots --curve 200 --csv compliance_curve.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import OUTCOME_CLASS, OUTCOME_CLASSES, THRESHOLDS, VENUES, analysis_frame, audit_venue
+
+
+class ComplianceIndex:
+    """Gaps sorted within cohorts: cohort `names[k]` owns `gaps[offsets[k]:offsets[k+1]]`."""
+
+    def __init__(self, names, offsets, gaps):
+        self.names = list(names)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.gaps = np.asarray(gaps, dtype=float)
+        self._pos = {name: k for k, name in enumerate(self.names)}
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        """Cohorts 'all', 'year=<decision year>' and 'outcome=<class>' of an analysis frame."""
+        gaps = analysis['gap_days'].to_numpy(dtype=float)
+        year = pd.to_datetime(analysis['t_decision'], unit='ms').dt.year.to_numpy()
+        cohorts = [('all', np.ones(len(gaps), dtype=bool))]
+        cohorts += [(f'year={y}', year == y) for y in np.unique(year)]
+        if 'outcome' in analysis:
+            outcome_class = OUTCOME_CLASS[analysis['outcome'].to_numpy()]
+            cohorts += [(f'outcome={OUTCOME_CLASSES[c]}', outcome_class == c) for c in np.unique(outcome_class)]
+        order = np.argsort(gaps, kind='stable')
+        sorted_gaps = gaps[order]
+        # Each cohort is a subsequence of the globally sorted gaps, so it stays sorted
+        parts = [sorted_gaps[mask[order]] for _, mask in cohorts]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=offsets[1:])
+        return cls([name for name, _ in cohorts], offsets, np.concatenate(parts) if parts else np.array([]))
+
+    def cohort(self, name='all'):
+        k = self._pos[name]
+        return self.gaps[self.offsets[k]:self.offsets[k + 1]]
+
+    def count(self, cohort='all'):
+        k = self._pos[cohort]
+        return int(self.offsets[k + 1] - self.offsets[k])
+
+    def share_above(self, thresholds, cohort='all'):
+        """Share of the cohort's gaps strictly above each threshold (scalar in, scalar out)."""
+        gaps = self.cohort(cohort)
+        if not len(gaps):
+            return np.full(np.shape(thresholds), np.nan)
+        return (len(gaps) - np.searchsorted(gaps, thresholds, side='right')) / len(gaps)
+
+    def quantile(self, q, cohort='all'):
+        gaps = self.cohort(cohort)
+        return np.quantile(gaps, q) if len(gaps) else np.full(np.shape(q), np.nan)
+
+    def curve(self, max_days=200, cohort='all'):
+        """Share above every whole day 0..max_days."""
+        days = np.arange(max_days + 1)
+        return days, self.share_above(days, cohort)
+
+    def table(self, thresholds=THRESHOLDS):
+        """Per-cohort N and share above each threshold."""
+        rows = []
+        for name in self.names:
+            row = {'cohort': name, 'n': self.count(name)}
+            row.update({f'share_gt_{t}': s for t, s in zip(thresholds, self.share_above(thresholds, name))})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def parse_thresholds(text):
+    """'28,35,42' -> [28, 35, 42]; fractional days are allowed."""
+    return [float(t) if '.' in t else int(t) for t in text.split(',') if t]
+
+
+def print_compliance_table(index, thresholds=THRESHOLDS):
+    table = index.table(thresholds)
+    print(f"\n=== Compliance by Cohort ===")
+    print(f"{'Cohort':<20} {'N':>6}" + ''.join(f" {'>' + str(t) + 'd':>7}" for t in thresholds))
+    for _, row in table.iterrows():
+        print(f"{row['cohort']:<20} {row['n']:>6}"
+              + ''.join(f" {row[f'share_gt_{t}'] * 100:>6.1f}%" for t in thresholds))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--thresholds', default=','.join(map(str, THRESHOLDS)),
+                        help='Comma-separated day thresholds (default: %(default)s)')
+    parser.add_argument('--curve', type=int, metavar='MAX_DAYS', help='Compute the curve for every day up to MAX_DAYS')
+    parser.add_argument('--csv', help='Write the curve (one column per cohort) to this CSV')
+    args = parser.parse_args()
+
+    df = audit_venue(VENUES[args.venue], snapshot_root=args.snapshots)
+    index = ComplianceIndex.from_analysis(analysis_frame(df))
+    print_compliance_table(index, parse_thresholds(args.thresholds))
+    if args.curve is not None:
+        days = np.arange(args.curve + 1)
+        curve = pd.DataFrame({'days': days, **{name: index.curve(args.curve, name)[1] for name in index.names}})
+        if args.csv:
+            os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+            curve.to_csv(args.csv, index=False)
+            print(f"\nSaved {args.csv}")
+        else:
+            print(f"\n=== Compliance Curve (share > T days, all decisions) ===")
+            for d in range(0, args.curve + 1, 7):
+                print(f"  > {d:>3} days: {curve['all'][d] * 100:5.1f}%")
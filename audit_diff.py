@@ -0,0 +1,215 @@
+"""Per-paper content hashes with a venue/year Merkle rollup, and snapshot diffs.
+
+Each submission's leaf hash covers its id, its extracted timeline (event
+types and times in CSR order) and its decision outcome. Leaves are grouped
+by venue and submission year, which never changes for a paper: a year node
+hashes its papers' (id, leaf) pairs in id order, a venue node its years', and
+the root its venues'. A manifest with the tree and a small summary per paper
+is written next to each snapshot (`<root>/<venue>/timeline_hashes.json`) and
+reused while the snapshot is unchanged.
+
+Comparing two snapshot roots descends only into the venues and years whose
+hashes differ, and reports exactly which submissions were added or removed,
+gained reviews or decisions, changed outcome or shifted gap. The root hash
+identifies the data a result was computed from.
+
+Usage:
+    python audit_diff.py hash snapshots --venues TMLR,ICLR2024
+    python audit_diff.py diff old_snapshots snapshots --csv changes.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import DECISION, OUTCOMES, REVIEW, SUBMISSION, VENUES, extract_records, load_notes, records_frame
+from audit_timeline import Timeline
+from openreview_snapshot import snapshot_meta
+
+MANIFEST = 'timeline_hashes.json'
+MANIFEST_VERSION = 1
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def node_hash(children):
+    """Hash of a `{key: hash}` node, independent of insertion order."""
+    return _digest(''.join(f'{k}:{children[k]}\n' for k in sorted(children)).encode())
+
+
+def leaf_hashes(timeline, outcome):
+    """Per-paper hash of id, event types, event times and outcome code."""
+    types, cdates = timeline.type.tobytes(), timeline.cdate.tobytes()
+    out = []
+    for p, pid in enumerate(timeline.ids):
+        lo, hi = timeline.offsets[p], timeline.offsets[p + 1]
+        out.append(_digest(b'\0'.join([str(pid).encode(), types[lo:hi], cdates[8 * lo:8 * hi],
+                                       bytes([int(outcome[p])])])))
+    return out
+
+
+def _opt(x, digits=None):
+    return None if pd.isna(x) else (round(float(x), digits) if digits is not None else int(x))
+
+
+def venue_manifest(venue, notes, fetched_at=None):
+    """Merkle tree and per-paper summaries of one venue's notes."""
+    df = records_frame(extract_records(notes, venue))
+    timeline = Timeline.from_notes(notes, venue)
+    leaves = leaf_hashes(timeline, df['outcome'].to_numpy())
+    t_sub = timeline.first(SUBMISSION)
+    year = np.where(np.isnan(t_sub), 'unknown',
+                    pd.to_datetime(np.nan_to_num(t_sub), unit='ms').year.astype(str).to_numpy())
+    years = {}
+    for p in range(len(timeline)):
+        years.setdefault(year[p], {})[str(timeline.ids[p])] = {
+            'hash': leaves[p],
+            'n_reviews': int(timeline.counts[p, REVIEW]),
+            'n_decisions': int(timeline.counts[p, DECISION]),
+            't_decision': _opt(df['t_decision'].iat[p]),
+            'gap_days': _opt(df['gap_days'].iat[p], 4),
+            'outcome': OUTCOMES[df['outcome'].iat[p]],
+        }
+    years = {y: {'hash': node_hash({pid: leaf['hash'] for pid, leaf in papers.items()}), 'papers': papers}
+             for y, papers in sorted(years.items())}
+    return {'version': MANIFEST_VERSION, 'venue': venue.key, 'fetched_at': fetched_at,
+            'hash': node_hash({y: node['hash'] for y, node in years.items()}), 'years': years}
+
+
+def load_manifest(venue, snapshot_root):
+    """The venue's manifest, rebuilt only if its snapshot was re-fetched since it was written."""
+    path = os.path.join(snapshot_root, venue.key)
+    fetched_at = snapshot_meta(path)['fetched_at'] if os.path.exists(os.path.join(path, 'meta.json')) else None
+    manifest_path = os.path.join(path, MANIFEST)
+    if fetched_at is not None and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION and manifest.get('fetched_at') == fetched_at:
+            return manifest
+    notes = load_notes(venue, snapshot_root=snapshot_root)
+    manifest = venue_manifest(venue, notes, snapshot_meta(path)['fetched_at'])
+    tmp = manifest_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+def root_hash(manifests):
+    return node_hash({m['venue']: m['hash'] for m in manifests})
+
+
+def _paper_change(old, new):
+    """Tags describing how one paper's summary changed."""
+    tags = []
+    if new['n_reviews'] != old['n_reviews']:
+        tags.append('gained reviews' if new['n_reviews'] > old['n_reviews'] else 'lost reviews')
+    if new['n_decisions'] != old['n_decisions']:
+        tags.append('gained decision' if new['n_decisions'] > old['n_decisions'] else 'lost decision')
+    elif new['t_decision'] != old['t_decision']:
+        tags.append('decision moved')
+    if new['outcome'] != old['outcome'] and old['outcome'] != 'none':
+        tags.append('outcome changed')
+    if new['gap_days'] != old['gap_days'] and None not in (old['gap_days'], new['gap_days']):
+        tags.append('gap shifted')
+    return tags or ['events changed']
+
+
+def diff_manifests(old, new):
+    """Changed submissions between two manifests of a venue, and how many year nodes were compared.
+
+    Returns `(changes, n_years_compared)`; identical venues and years are
+    skipped on their hash alone.
+    """
+    changes = []
+    if old['hash'] == new['hash']:
+        return changes, 0
+    old_years, new_years = old['years'], new['years']
+    compared = 0
+    for y in sorted(set(old_years) | set(new_years)):
+        a = old_years.get(y, {'hash': None, 'papers': {}})
+        b = new_years.get(y, {'hash': None, 'papers': {}})
+        if a['hash'] == b['hash']:
+            continue
+        compared += 1
+        pa, pb = a['papers'], b['papers']
+        for pid in sorted(set(pa) | set(pb)):
+            before, after = pa.get(pid), pb.get(pid)
+            if before is not None and after is not None and before['hash'] == after['hash']:
+                continue
+            row = {'venue': new['venue'], 'year': y, 'id': pid}
+            if before is None:
+                row['change'] = 'added'
+            elif after is None:
+                row['change'] = 'removed'
+            else:
+                row['change'] = ', '.join(_paper_change(before, after))
+            for key in ['n_reviews', 'n_decisions', 'gap_days', 'outcome']:
+                row[f'{key}_old'] = before[key] if before else None
+                row[f'{key}_new'] = after[key] if after else None
+            changes.append(row)
+    return changes, compared
+
+
+def print_diff(manifests_old, manifests_new, changes):
+    print(f"\n=== Snapshot Diff ===")
+    print(f"Root: {root_hash(manifests_old)} -> {root_hash(manifests_new)}")
+    for old, new in zip(manifests_old, manifests_new):
+        status = 'unchanged' if old['hash'] == new['hash'] else 'changed'
+        print(f"  {new['venue']:<14} {old['hash']} -> {new['hash']} ({status})")
+    if changes.empty:
+        print("No submission changed.")
+        return
+    print(f"\n{'Venue':<14} {'Year':<8} {'Id':<20} {'Reviews':>8} {'Gap (days)':>16}  Change")
+    for _, row in changes.iterrows():
+        reviews = f"{_fmt(row['n_reviews_old'])}->{_fmt(row['n_reviews_new'])}"
+        gap = f"{_fmt(row['gap_days_old'], 1)}->{_fmt(row['gap_days_new'], 1)}"
+        print(f"{row['venue']:<14} {row['year']:<8} {row['id']:<20} {reviews:>8} {gap:>16}  {row['change']}")
+    counts = changes['change'].str.split(', ').explode().value_counts()
+    print("\n" + ', '.join(f"{n} {tag}" for tag, n in counts.items()))
+
+
+def _fmt(x, digits=None):
+    if x is None or pd.isna(x):
+        return '-'
+    return f'{x:.{digits}f}' if digits is not None else str(int(x))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_hash = sub.add_parser('hash', help='Write (or reuse) the manifests and print the tree hashes')
+    p_hash.add_argument('snapshots', help='Snapshot root directory')
+    p_diff = sub.add_parser('diff', help='Report the submissions that differ between two snapshot roots')
+    p_diff.add_argument('old', help='Snapshot root of the earlier run')
+    p_diff.add_argument('new', help='Snapshot root of the later run')
+    p_diff.add_argument('--csv', help='Write the changed submissions to this CSV')
+    for p in (p_hash, p_diff):
+        p.add_argument('--venues', default='TMLR', help=f"Comma-separated keys from: {', '.join(VENUES)}")
+    args = parser.parse_args()
+
+    venues = [VENUES[k] for k in args.venues.split(',')]
+    if args.command == 'hash':
+        manifests = [load_manifest(v, args.snapshots) for v in venues]
+        print(f"Root: {root_hash(manifests)}")
+        for m in manifests:
+            print(f"  {m['venue']:<14} {m['hash']}")
+            for y, node in m['years'].items():
+                print(f"    {y:<12} {node['hash']} ({len(node['papers'])} submissions)")
+    else:
+        old = [load_manifest(v, args.old) for v in venues]
+        new = [load_manifest(v, args.new) for v in venues]
+        rows = []
+        for a, b in zip(old, new):
+            rows += diff_manifests(a, b)[0]
+        changes = pd.DataFrame(rows, columns=['venue', 'year', 'id', 'change'] + [
+            f'{k}_{s}' for k in ['n_reviews', 'n_decisions', 'gap_days', 'outcome'] for s in ['old', 'new']])
+        print_diff(old, new, changes)
+        if args.csv:
+            os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+            changes.to_csv(args.csv, index=False)
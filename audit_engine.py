@@ -0,0 +1,350 @@
+"""Venue-parameterized decision-timeline audit over OpenReview.
+
+Each venue is a `VenueConfig` that names its submission invitation and the
+invitation substrings that mark review, decision and review-release replies.
+Venues are fetched and extracted in parallel worker processes, each with its
+own snapshot directory, and the per-submission records are merged into one
+cross-venue table and report. Adding a venue is one entry in VENUES.
+
+Usage:
+    python audit_engine.py --venues TMLR,ICLR2024,ICLR2025 --workers 3
+    python audit_engine.py --venues TMLR --snapshots snapshots --refresh
+"""
+import argparse
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from openreview_snapshot import OPENREVIEW_BASEURL, fetch_snapshot, note_to_dict, read_snapshot
+
+MS_PER_DAY = 1000 * 60 * 60 * 24
+
+# Event type codes used by extract_events
+EVENT_TYPES = ['submission', 'review', 'decision', 'release', 'other']
+SUBMISSION, REVIEW, DECISION, RELEASE, OTHER = range(len(EVENT_TYPES))
+
+THRESHOLDS = [28, 35, 42]
+
+# Decision outcome codes stored in the records' `outcome` column. OUTCOME_CLASS
+# maps each to the coarse accept/reject/other class used by the reports. The
+# revision codes come from TMLR recommendations ('Accept with minor revision'),
+# the oral/spotlight/poster codes from conference decisions ('Accept (oral)').
+OUTCOMES = ['none', 'accept', 'accept_as_is', 'accept_minor_revision', 'accept_major_revision',
+            'accept_oral', 'accept_spotlight', 'accept_poster', 'reject', 'desk_reject', 'other']
+(NO_OUTCOME, ACCEPT, ACCEPT_AS_IS, ACCEPT_MINOR, ACCEPT_MAJOR, ACCEPT_ORAL, ACCEPT_SPOTLIGHT, ACCEPT_POSTER,
+ REJECT, DESK_REJECT, OTHER_OUTCOME) = range(len(OUTCOMES))
+OUTCOME_CLASSES = ['none', 'accept', 'reject', 'other']
+OUTCOME_CLASS = np.array([0, 1, 1, 1, 1, 1, 1, 1, 2, 2, 3], dtype=np.int8)
+
+_ACCEPT_KINDS = [('as is', ACCEPT_AS_IS), ('minor', ACCEPT_MINOR), ('major', ACCEPT_MAJOR),
+                 ('oral', ACCEPT_ORAL), ('spotlight', ACCEPT_SPOTLIGHT), ('poster', ACCEPT_POSTER)]
+
+
+@dataclass(frozen=True)
+class VenueConfig:
+    """Where a venue's submissions live and how its replies are classified.
+
+    A reply is a review if one of its invitations contains a `review`
+    substring and none of `review_exclude`, and a decision if one contains a
+    `decision` substring; its invitations are checked in order and the first
+    match wins. Replies carrying a `release` invitation additionally mark
+    when reviews were released (their `odate`, falling back to `cdate`). The
+    decision's outcome text is read from its `decision_field` content field.
+    """
+    key: str
+    name: str
+    submission: str
+    review: tuple = ('/Review',)
+    review_exclude: tuple = ('Official_Recommendation',)
+    decision: tuple = ('/Decision',)
+    release: tuple = ('/Review_Release',)
+    decision_field: str = 'recommendation'
+    # Other reply invitations the venue is known to use (not flagged by audit_quality.py)
+    known_replies: tuple = ('/Official_Comment', '/Public_Comment', '/Comment', '/Official_Recommendation',
+                            '/Meta_Review', '/Rebuttal', '/Revision', '/Camera_Ready_Revision', '/Withdrawal',
+                            '/Desk_Rejection', '/Retraction', '/Ethics_Review', '/Authors_Deanonymization',
+                            '/Moderation')
+
+    def reply_invitations(self):
+        """Venue-level invitations of the classified replies, e.g. 'TMLR/-/Review'."""
+        prefix = self.submission.split('/-/')[0]
+        return [f'{prefix}/-{p}' for p in self.review + self.decision + self.release]
+
+
+VENUES = {
+    'TMLR': VenueConfig('TMLR', 'TMLR', 'TMLR/-/Submission'),
+    'ICLR2024': VenueConfig('ICLR2024', 'ICLR 2024', 'ICLR.cc/2024/Conference/-/Submission',
+                            review=('/Official_Review',), release=(), decision_field='decision'),
+    'ICLR2025': VenueConfig('ICLR2025', 'ICLR 2025', 'ICLR.cc/2025/Conference/-/Submission',
+                            review=('/Official_Review',), release=(), decision_field='decision'),
+    'NeurIPS2024': VenueConfig('NeurIPS2024', 'NeurIPS 2024', 'NeurIPS.cc/2024/Conference/-/Submission',
+                               review=('/Official_Review',), release=(), decision_field='decision'),
+}
+
+
+def classify_reply(invitations, venue):
+    """Return 'review', 'decision' or None for a reply's invitation list."""
+    for inv in invitations:
+        if any(p in inv for p in venue.review) and not any(p in inv for p in venue.review_exclude):
+            return 'review'
+        if any(p in inv for p in venue.decision):
+            return 'decision'
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def outcome_code(rec):
+    """Outcome code of a lowercased recommendation string (memoized per distinct string).
+
+    Anything mentioning 'reject' is a rejection and anything else mentioning
+    'accept' an acceptance, matching the substring tests of the reports.
+    """
+    if not rec:
+        return NO_OUTCOME
+    if 'reject' in rec:
+        return DESK_REJECT if 'desk' in rec else REJECT
+    if 'accept' in rec:
+        return next((code for key, code in _ACCEPT_KINDS if key in rec), ACCEPT)
+    return OTHER_OUTCOME
+
+
+def extract_record(note, venue):
+    """Per-submission record: review count, third review, first release, earliest decision."""
+    note = note_to_dict(note)
+    replies = (note.get('details') or {}).get('replies', [])
+    review_times = []
+    release_time = None
+    decision_time = None
+    decision_content = None
+
+    for reply in replies:
+        invitations = reply.get('invitations', [])
+        cdate = reply.get('cdate')
+        if cdate is None:
+            continue
+        if venue.release and any(p in inv for inv in invitations for p in venue.release):
+            t = reply.get('odate') or cdate
+            if release_time is None or t < release_time:
+                release_time = t
+        kind = classify_reply(invitations, venue)
+        if kind == 'review':
+            review_times.append(cdate)
+        elif kind == 'decision':
+            if decision_time is None or cdate < decision_time:
+                decision_time = cdate
+                decision_content = reply.get('content', {})
+
+    review_times_sorted = sorted(review_times)
+    t_third_review = review_times_sorted[2] if len(review_times_sorted) >= 3 else None
+
+    # Extract the decision text (kept in the `recommendation` column for every venue)
+    rec = ''
+    if decision_content:
+        rec = decision_content.get(venue.decision_field, '')
+        if isinstance(rec, dict):
+            rec = rec.get('value', '')
+        rec = str(rec).lower()
+
+    return {
+        'venue': venue.key,
+        'id': note['id'],
+        'n_reviews': len(review_times),
+        't_third_review': t_third_review,
+        't_review_release': release_time,
+        't_decision': decision_time,
+        'censored': decision_time is None,
+        'recommendation': rec,
+        'outcome': outcome_code(rec),
+    }
+
+
+def extract_records(notes, venue):
+    return [extract_record(note, venue) for note in notes]
+
+
+def extract_events(notes, venue, records=None):
+    """One row per timestamped event, in note order.
+
+    Every submission contributes a `submission` event at its cdate and each
+    reply with a cdate one `review`, `decision` or `other` event, signed by
+    its first signature. Replies carrying a release invitation add a
+    `release` event at their odate. `paper` is the submission's position in
+    `notes`, i.e. its row in the records table. Notes without a cdate are
+    skipped; their papers are listed in `attrs['no_cdate']`. Given a
+    `records` list, each note's `extract_record` is appended to it in the
+    same pass.
+    """
+    paper, etype, cdate, signature, invitation = [], [], [], [], []
+    no_cdate = []
+
+    def add(i, t, c, sigs, inv):
+        paper.append(i)
+        etype.append(t)
+        cdate.append(c)
+        signature.append(sigs[0] if sigs else '')
+        invitation.append(inv.rsplit('/', 1)[-1])
+
+    for i, note in enumerate(notes):
+        note = note_to_dict(note)
+        if records is not None:
+            records.append(extract_record(note, venue))
+        if note.get('cdate') is not None:
+            add(i, SUBMISSION, note['cdate'], note.get('signatures'), venue.submission)
+        else:
+            no_cdate.append(i)
+        for reply in (note.get('details') or {}).get('replies', []):
+            invitations = reply.get('invitations', [])
+            if reply.get('cdate') is None:
+                no_cdate.append(i)
+                continue
+            kind = classify_reply(invitations, venue)
+            etype_code = REVIEW if kind == 'review' else DECISION if kind == 'decision' else OTHER
+            add(i, etype_code, reply['cdate'], reply.get('signatures'), invitations[0] if invitations else '')
+            if venue.release and any(p in inv for inv in invitations for p in venue.release):
+                add(i, RELEASE, reply.get('odate') or reply['cdate'], reply.get('signatures'),
+                    next(inv for inv in invitations if any(p in inv for p in venue.release)))
+
+    events = pd.DataFrame({
+        'paper': np.array(paper, dtype=np.int32),
+        'type': np.array(etype, dtype=np.int8),
+        'cdate': np.array(cdate, dtype=np.int64),
+        'signature': pd.Categorical(signature),
+        'invitation': pd.Categorical(invitation),
+    })
+    events.attrs['no_cdate'] = no_cdate
+    return events
+
+
+def records_frame(records):
+    """DataFrame of records with `gap_days` from third review to decision."""
+    df = pd.DataFrame(records)
+    df['outcome'] = df['outcome'].astype(np.int8)
+    df['gap_days'] = (df['t_decision'] - df['t_third_review']) / MS_PER_DAY
+    return df
+
+
+def analysis_frame(df):
+    """Decided submissions with a third review and a non-negative gap."""
+    return df[(~df['censored']) & (df['t_third_review'].notna()) & (df['gap_days'] >= 0)].copy()
+
+
+def load_notes(venue, snapshot_root=None, refresh=False, client=None, project=False):
+    """Submissions with replies for a venue, from its snapshot when one is kept.
+
+    With `snapshot_root`, the venue lives in `<snapshot_root>/<key>/` and is
+    fetched only if missing or when `refresh` is set. Without it, the API is
+    queried directly. `project` fetches only the review, decision and release
+    replies with the fields the audit reads (through a `LeanClient`), so
+    other replies are absent from the notes.
+    """
+    if project and client is None:
+        from openreview_lean import LeanClient
+        client = LeanClient(decision_field=venue.decision_field)
+    if snapshot_root is None:
+        if project:
+            return client.get_projected_notes(venue.submission, venue.reply_invitations())
+        if client is None:
+            import openreview
+            client = openreview.api.OpenReviewClient(baseurl=OPENREVIEW_BASEURL)
+        return client.get_all_notes(invitation=venue.submission, details='replies')
+    return read_snapshot(snapshot_path(venue, snapshot_root, refresh, client, project))
+
+
+def snapshot_path(venue, snapshot_root, refresh=False, client=None, project=False):
+    """`<snapshot_root>/<key>`, fetched first if missing or when `refresh` is set."""
+    path = os.path.join(snapshot_root, venue.key)
+    if refresh or not os.path.exists(os.path.join(path, 'notes.jsonl.gz')):
+        fetch_snapshot(path, invitation=venue.submission, client=client,
+                       reply_invitations=venue.reply_invitations() if project else None)
+    return path
+
+
+def audit_venue(venue, snapshot_root=None, refresh=False, client=None, project=False, workers=None):
+    """Fetch (or load) and extract one venue into a records DataFrame.
+
+    With a snapshot and `workers` > 1, extraction is sharded over that many
+    processes (see audit_shards.py).
+    """
+    if isinstance(venue, str):
+        venue = VENUES[venue]
+    if snapshot_root is not None and workers and workers > 1:
+        from audit_shards import extract_sharded
+        return extract_sharded(snapshot_path(venue, snapshot_root, refresh, client, project), venue, workers)
+    notes = load_notes(venue, snapshot_root=snapshot_root, refresh=refresh, client=client, project=project)
+    return records_frame(extract_records(notes, venue))
+
+
+def run_audit(venues, snapshot_root='snapshots', refresh=False, workers=None, lean=False, project=False):
+    """Audit several venues in parallel worker processes and merge the records.
+
+    With `lean`, fetches go through `openreview_lean.LeanClient` (one per
+    venue); `project` additionally fetches only the fields the audit reads.
+    """
+    venues = [VENUES[v] if isinstance(v, str) else v for v in venues]
+    workers = workers or len(venues)
+    if lean or project:
+        from openreview_lean import LeanClient
+        clients = [LeanClient(decision_field=v.decision_field) for v in venues]
+    else:
+        clients = [None] * len(venues)
+    n = len(venues)
+    if workers == 1 or n == 1:
+        frames = [audit_venue(v, snapshot_root, refresh, c, project) for v, c in zip(venues, clients)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(audit_venue, venues, [snapshot_root] * n, [refresh] * n, clients, [project] * n))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(df, thresholds=THRESHOLDS):
+    """Per-venue N, quantiles, compliance shares and censoring counts."""
+    rows = []
+    for key, venue_df in df.groupby('venue', sort=False):
+        gaps = analysis_frame(venue_df)['gap_days']
+        row = {'venue': key, 'n_submissions': len(venue_df), 'n': len(gaps),
+               'censored': int(venue_df['censored'].sum())}
+        for q in [0.5, 0.75, 0.9, 0.95, 0.99]:
+            row[f'p{int(q * 100)}'] = gaps.quantile(q) if len(gaps) else np.nan
+        for t in thresholds:
+            row[f'share_gt_{t}'] = (gaps > t).mean() if len(gaps) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def print_cross_venue_report(df, thresholds=THRESHOLDS):
+    summary = summarize(df, thresholds)
+    print(f"\n=== Cross-Venue Audit Results ===")
+    header = f"{'Venue':<14} {'N':>6} {'Cens.':>6} {'Median':>7} {'75th':>6} {'90th':>6}"
+    header += ''.join(f" {'>' + str(t) + 'd':>6}" for t in thresholds)
+    print(header)
+    for _, row in summary.iterrows():
+        line = (f"{row['venue']:<14} {row['n']:>6} {row['censored']:>6} {row['p50']:>7.1f} "
+                f"{row['p75']:>6.1f} {row['p90']:>6.1f}")
+        line += ''.join(f" {row[f'share_gt_{t}'] * 100:>5.1f}%" for t in thresholds)
+        print(line)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venues', default='TMLR', help=f"Comma-separated keys from: {', '.join(VENUES)}")
+    parser.add_argument('--snapshots', default='snapshots', help='Root directory for per-venue snapshots')
+    parser.add_argument('--refresh', action='store_true', help='Re-fetch snapshots even if present')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per venue)')
+    parser.add_argument('--lean', action='store_true',
+                        help='Fetch with the lean raw-JSON client (needs msgspec); snapshots keep only audit fields')
+    parser.add_argument('--project', action='store_true',
+                        help='With the lean client, fetch only review/decision/release replies and their audit fields')
+    args = parser.parse_args()
+
+    keys = args.venues.split(',')
+    unknown = [k for k in keys if k not in VENUES]
+    if unknown:
+        parser.error(f"unknown venue(s): {', '.join(unknown)}")
+    df = run_audit(keys, snapshot_root=args.snapshots, refresh=args.refresh, workers=args.workers,
+                   lean=args.lean, project=args.project)
+    print_cross_venue_report(df)
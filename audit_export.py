@@ -0,0 +1,127 @@
+"""Partitioned Parquet export of the per-submission record table.
+
+Records from `audit_engine` are written as a hive-partitioned dataset,
+`<root>/venue=<key>/decision_year=<year>/part-0.parquet`. Undecided
+submissions go to the null `decision_year` partition. The schema is fixed
+(RECORD_SCHEMA, with its version in the file metadata) and every file has
+column statistics. Rows inside a partition are sorted by decision time, so
+readers can skip partitions and row groups by predicate and load only the
+columns they need. Re-exporting a venue replaces all of that venue's
+partitions (including years it no longer has) and leaves other venues alone.
+
+Usage:
+    python audit_export.py --venues TMLR,ICLR2024 --snapshots snapshots --out records
+    python -c "import audit_export; print(audit_export.read_records('records', venue='TMLR', year=2024))"
+"""
+import argparse
+import os
+import shutil
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from audit_engine import OUTCOMES, VENUES, analysis_frame, run_audit
+
+SCHEMA_VERSION = 2
+
+RECORD_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('n_reviews', pa.int32()),
+    ('t_third_review', pa.timestamp('ms', tz='UTC')),
+    ('t_review_release', pa.timestamp('ms', tz='UTC')),
+    ('t_decision', pa.timestamp('ms', tz='UTC')),
+    ('censored', pa.bool_()),
+    ('gap_days', pa.float64()),
+    ('recommendation', pa.string()),
+    ('outcome', pa.dictionary(pa.int8(), pa.string())),
+    ('in_analysis', pa.bool_()),
+    ('venue', pa.string()),
+    ('decision_year', pa.int16()),
+], metadata={'audit_export.schema_version': str(SCHEMA_VERSION)})
+
+PARTITIONING = ds.partitioning(pa.schema([('venue', pa.string()), ('decision_year', pa.int16())]),
+                               flavor='hive')
+
+
+def _timestamps(values):
+    return pd.to_datetime(pd.Series(values, dtype='float64'), unit='ms', utc=True)
+
+
+def records_table(df):
+    """Arrow table of a records frame (from `records_frame`/`run_audit`) in RECORD_SCHEMA."""
+    t_decision = _timestamps(df['t_decision'])
+    out = pd.DataFrame({
+        'id': df['id'].astype(str),
+        'n_reviews': df['n_reviews'].astype(np.int32),
+        't_third_review': _timestamps(df['t_third_review']),
+        't_review_release': _timestamps(df['t_review_release']),
+        't_decision': t_decision,
+        'censored': df['censored'].astype(bool),
+        'gap_days': df['gap_days'].astype(float),
+        'recommendation': df['recommendation'].astype(str),
+        'outcome': pd.Categorical.from_codes(df['outcome'], OUTCOMES),
+        'in_analysis': df.index.isin(analysis_frame(df).index),
+        'venue': df['venue'].astype(str),
+        'decision_year': t_decision.dt.year.astype('Int16'),
+    })
+    out = out.sort_values(['venue', 't_decision'], kind='stable', na_position='last')
+    table = pa.Table.from_pandas(out, schema=RECORD_SCHEMA, preserve_index=False)
+    return table.replace_schema_metadata(RECORD_SCHEMA.metadata)
+
+
+def export_records(df, root, row_group_size=64 * 1024):
+    """Write `df` under `root`, replacing the partitions of the venues it contains."""
+    table = records_table(df)
+    # delete_matching only replaces the partitions being written, so drop the venue's old years first
+    for venue in pd.unique(df['venue'].astype(str)):
+        shutil.rmtree(os.path.join(root, f"venue={quote(venue, safe='')}"), ignore_errors=True)
+    ds.write_dataset(
+        table, root, format='parquet', partitioning=PARTITIONING,
+        basename_template='part-{i}.parquet', existing_data_behavior='delete_matching',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd', write_statistics=True),
+        max_rows_per_group=row_group_size, min_rows_per_group=min(row_group_size, 1024),
+    )
+    return table
+
+
+def records_dataset(root):
+    return ds.dataset(root, schema=RECORD_SCHEMA, format='parquet', partitioning=PARTITIONING)
+
+
+def read_records(root, columns=None, venue=None, year=None, filter=None):
+    """Load exported records as a DataFrame, pruning partitions and columns.
+
+    `venue` and `year` may be single values or lists; `filter` is any extra
+    `pyarrow.dataset` expression, e.g. `ds.field('n_reviews') >= 4`.
+    """
+    expr = filter
+    for name, value in [('venue', venue), ('decision_year', year)]:
+        if value is None:
+            continue
+        cond = ds.field(name).isin(value) if isinstance(value, (list, tuple)) else ds.field(name) == value
+        expr = cond if expr is None else expr & cond
+    return records_dataset(root).to_table(columns=columns, filter=expr).to_pandas()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venues', default='TMLR', help=f"Comma-separated keys from: {', '.join(VENUES)}")
+    parser.add_argument('--snapshots', default='snapshots', help='Root directory for per-venue snapshots')
+    parser.add_argument('--refresh', action='store_true', help='Re-fetch snapshots even if present')
+    parser.add_argument('--out', default='records', help='Dataset root directory')
+    args = parser.parse_args()
+
+    keys = args.venues.split(',')
+    unknown = [k for k in keys if k not in VENUES]
+    if unknown:
+        parser.error(f"unknown venue(s): {', '.join(unknown)}")
+    df = run_audit(keys, snapshot_root=args.snapshots, refresh=args.refresh)
+    table = export_records(df, args.out)
+    print(f"Wrote {table.num_rows} records to {args.out}/")
+    counts = table.group_by(['venue', 'decision_year']).aggregate([('id', 'count')]).to_pandas()
+    for _, row in counts.sort_values(['venue', 'decision_year']).iterrows():
+        year = 'undecided' if pd.isna(row['decision_year']) else int(row['decision_year'])
+        print(f"  venue={row['venue']:<12} decision_year={str(year):<10} {row['id_count']:>6} rows")
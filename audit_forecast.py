@@ -0,0 +1,183 @@
+"""Decision-date forecasts for pending submissions.
+
+Delays are fitted with a Kaplan-Meier estimator, so papers still waiting
+count as censored observations rather than being dropped (dropping them
+biases the delay distribution short). Papers with a third review are
+forecast from the third-review -> decision delay and the others from the
+submission -> decision delay. Each pending paper's draw is conditioned on
+the time it has already waited: with survival curve S and age a, the
+decision delay T satisfies S(T) <= v * S(a) for v ~ U(0, 1), which is one
+`searchsorted` for all papers and draws at once. Draws beyond the longest
+observed delay stay undecided.
+
+Usage:
+    python audit_forecast.py --snapshots snapshots
+    python audit_forecast.py --snapshots snapshots --as-of 2024-06-01 --draws 10000
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import (MS_PER_DAY, SUBMISSION, VENUES, extract_events, extract_records, load_notes,
+                          records_frame)
+from audit_asof import records_as_of, to_ms
+from audit_timeline import Timeline
+
+WEEK_MS = 7 * MS_PER_DAY
+
+
+def kaplan_meier(durations, observed):
+    """Survival curve `(times, survival)`: S(t) = survival[k] for times[k] <= t < times[k+1]."""
+    durations = np.asarray(durations, dtype=float)
+    observed = np.asarray(observed, dtype=bool)
+    times, inverse = np.unique(durations, return_inverse=True)
+    deaths = np.bincount(inverse, weights=observed, minlength=len(times))
+    at_risk = len(durations) - np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(times)))[:-1]])
+    keep = deaths > 0
+    return times[keep], np.cumprod(1 - deaths[keep] / at_risk[keep])
+
+
+def survival_at(curve, t):
+    times, survival = curve
+    k = np.searchsorted(times, t, side='right')
+    return np.where(k > 0, survival[np.maximum(k - 1, 0)], 1.0)
+
+
+def sample_delays(curve, age, draws, rng):
+    """(len(age), draws) delays given each paper has already waited `age`; NaN = beyond the fitted curve."""
+    times, survival = curve
+    target = rng.random((len(age), draws)) * survival_at(curve, age)[:, None]
+    # First time with S(t) <= target; -survival is non-decreasing
+    k = np.searchsorted(-survival, -target, side='left')
+    out = np.full(target.shape, np.nan)
+    ok = k < len(times)
+    out[ok] = times[k[ok]]
+    # A curve that ends in a decision before `age` has nothing left to draw from
+    out[out < age[:, None]] = np.nan
+    return out
+
+
+def fit_curves(df, now):
+    """KM curves (days) for the submission -> decision and third review -> decision delays."""
+    decided = ~df['censored'].to_numpy()
+    t_sub = df['t_submission'].to_numpy(dtype=float)
+    t_third = df['t_third_review'].to_numpy(dtype=float)
+    end = np.where(decided, df['t_decision'].to_numpy(dtype=float), now)
+    curves = {}
+    for stage, start in [('submission', t_sub), ('third_review', t_third)]:
+        ok = ~np.isnan(start) & (end >= start)
+        curves[stage] = kaplan_meier((end[ok] - start[ok]) / MS_PER_DAY, decided[ok])
+    return curves
+
+
+def forecast(df, now, draws=10000, seed=0, chunk=256):
+    """Monte Carlo decision dates for every pending paper in `df` as of `now` (ms).
+
+    Returns `(pending, weekly)`: per-paper quantiles of the forecast decision
+    date and the probability of a decision within 4 weeks, and the expected
+    number of decisions per week ahead with a 10-90% band across draws.
+    Papers are drawn `chunk` at a time and each block is reduced to its
+    per-paper quantiles and per-draw weekly counts before the next, so
+    memory is bounded by `chunk` x `draws` rather than all pending papers.
+    """
+    rng = np.random.default_rng(seed)
+    curves = fit_curves(df, now)
+    pending = df[df['censored']].reset_index(drop=True)
+    reviewed = pending['t_third_review'].notna().to_numpy()
+    start = np.where(reviewed, pending['t_third_review'], pending['t_submission']).astype(float)
+    age = (now - start) / MS_PER_DAY
+
+    q = np.empty((3, len(pending)))
+    p_within_4w = np.empty(len(pending))
+    per_draw = np.zeros((draws, 0), dtype=np.int64)
+    undecided = 0
+    for lo in range(0, len(pending), chunk):
+        block = slice(lo, lo + chunk)
+        t_dec = np.empty((len(age[block]), draws))
+        for stage, mask in [('third_review', reviewed[block]), ('submission', ~reviewed[block])]:
+            if mask.any():
+                t_dec[mask] = start[block][mask, None] + sample_delays(curves[stage], age[block][mask], draws,
+                                                                       rng) * MS_PER_DAY
+        decided_in = ~np.isnan(t_dec)
+        q[:, block] = np.quantile(np.where(decided_in, t_dec, np.inf), [0.1, 0.5, 0.9], axis=1,
+                                  method='inverted_cdf')
+        p_within_4w[block] = (t_dec <= now + 4 * WEEK_MS).mean(axis=1)
+        undecided += int((~decided_in).sum())
+
+        # Decisions per (draw, week ahead) in one bincount, growing the week axis as needed
+        week = np.floor((t_dec[decided_in] - now) / WEEK_MS).astype(np.int64)
+        if len(week) and week.max() >= per_draw.shape[1]:
+            per_draw = np.pad(per_draw, ((0, 0), (0, int(week.max()) + 1 - per_draw.shape[1])))
+        n_weeks = per_draw.shape[1]
+        key = np.nonzero(decided_in)[1] * n_weeks + week
+        per_draw += np.bincount(key, minlength=draws * n_weeks).reshape(draws, n_weeks)
+
+    summary = pd.DataFrame({
+        'id': pending['id'],
+        'stage': np.where(reviewed, 'awaiting decision', 'in review'),
+        'waited_days': age,
+        'p10': q[0], 'median': q[1], 'p90': q[2],
+        'p_within_4w': p_within_4w,
+    })
+    for col in ['p10', 'median', 'p90']:
+        summary[col] = pd.to_datetime(np.where(np.isfinite(summary[col]), summary[col], np.nan), unit='ms')
+
+    n_weeks = per_draw.shape[1]
+    weekly = pd.DataFrame({
+        'week_start': pd.to_datetime(now + np.arange(n_weeks) * WEEK_MS, unit='ms'),
+        'expected': per_draw.mean(axis=0),
+        'p10': np.percentile(per_draw, 10, axis=0),
+        'p90': np.percentile(per_draw, 90, axis=0),
+    })
+    summary.attrs['undecided'] = undecided / (len(pending) * draws) if len(pending) else float('nan')
+    return summary, weekly
+
+
+def realized_weekly(df_now, pending_ids, now, n_weeks):
+    """Decisions actually posted per week after `now` for papers pending at `now` (backtests)."""
+    done = df_now[df_now['id'].isin(pending_ids) & ~df_now['censored']]
+    week = ((done['t_decision'] - now) // WEEK_MS).astype(int)
+    return np.bincount(week[(week >= 0) & (week < n_weeks)].to_numpy(), minlength=n_weeks)
+
+
+def print_forecast(summary, weekly, now, realized=None, weeks=12):
+    print(f"\n=== Decision Forecast as of {pd.to_datetime(now, unit='ms').date()} ===")
+    print(f"Pending: {len(summary)} ({(summary['stage'] == 'awaiting decision').sum()} awaiting decision, "
+          f"{(summary['stage'] == 'in review').sum()} in review)")
+    print(f"Expected decisions within 4 weeks: {summary['p_within_4w'].sum():.0f}")
+    print(f"Draws beyond the longest observed delay: {summary.attrs['undecided'] * 100:.1f}%")
+    header = f"\n{'Week of':<11} {'Expected':>9} {'10th':>6} {'90th':>6}"
+    print(header + (f" {'Actual':>7}" if realized is not None else ''))
+    for i, row in weekly.head(weeks).iterrows():
+        line = f"{str(row['week_start'].date()):<11} {row['expected']:>9.1f} {row['p10']:>6.0f} {row['p90']:>6.0f}"
+        print(line + (f" {realized[i]:>7}" if realized is not None else ''))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--as-of', help='Forecast from this past date and compare with what happened')
+    parser.add_argument('--draws', type=int, default=10000, help='Monte Carlo draws per paper')
+    parser.add_argument('--weeks', type=int, default=12, help='Weeks of throughput to print')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='Write the per-paper forecast to this CSV')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    notes = load_notes(venue, snapshot_root=args.snapshots)
+    df_now = records_frame(extract_records(notes, venue))
+    timeline = Timeline.from_events(extract_events(notes, venue), df_now['id'].to_numpy(dtype=object))
+    now = to_ms(args.as_of) if args.as_of else int(timeline.time_order()[1][-1])
+    view = timeline.as_of(now)
+    df = records_as_of(view, df_now)
+    df['t_submission'] = view.first(SUBMISSION)[view.count(SUBMISSION) > 0]
+
+    summary, weekly = forecast(df, now, draws=args.draws, seed=args.seed)
+    realized = realized_weekly(df_now, summary['id'], now, len(weekly)) if args.as_of else None
+    print_forecast(summary, weekly, now, realized, weeks=args.weeks)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        summary.to_csv(args.out, index=False)
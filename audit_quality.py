@@ -0,0 +1,125 @@
+"""Data-quality and anomaly checks over the extracted records and events.
+
+The audit silently drops some rows (negative gaps, replies without a cdate)
+and resolves others (several decisions: the earliest wins). This report
+counts every such case, with sample submission ids. All checks are boolean
+masks or bincounts over the event table and the records, with no per-note
+loop beyond the extraction itself, so they cost little next to it.
+`audit_with_quality` extracts records and events in one pass over the notes
+and checks them; `tmlr_audit.py` uses it as its extraction, so every audit
+run prints the report.
+
+Checks:
+    no_cdate                 notes skipped by the extraction for lack of a cdate
+    negative_gap             decision before the third review (dropped from the analysis)
+    duplicate_decisions      more than one decision reply (the earliest is used)
+    many_reviews             more review replies than --max-reviews
+    unclassified_replies     replies under none of the venue's review, decision or known
+                             reply invitations (`VenueConfig.known_replies`), per invitation
+    reply_before_submission  reply timestamp earlier than its submission
+    future_timestamp         event after the snapshot's fetch time (or now)
+    gap_outlier              gap beyond Q3 + 3 IQR
+
+Usage:
+    python audit_quality.py --snapshots snapshots --venues TMLR,ICLR2024
+    python audit_quality.py --snapshots snapshots --max-reviews 5 --samples 10 --csv quality.csv
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import DECISION, OTHER, REVIEW, SUBMISSION, VENUES, extract_events, load_notes, records_frame
+from openreview_snapshot import snapshot_meta
+
+
+def _check(name, ids, mask, samples, detail=''):
+    hit = ids[mask]
+    return {'check': name, 'detail': detail, 'count': int(mask.sum()), 'sample_ids': list(pd.unique(hit)[:samples])}
+
+
+def quality_report(df, events, venue, now=None, max_reviews=6, samples=5):
+    """One row per check (and per invitation for unclassified replies): count and sample ids.
+
+    `df` and `events` come from the same notes (`extract_records` /
+    `extract_events`), so `events['paper']` indexes `df` rows.
+    """
+    ids = df['id'].to_numpy(dtype=object)
+    paper = events['paper'].to_numpy()
+    etype = events['type'].to_numpy()
+    cdate = events['cdate'].to_numpy()
+    n = len(df)
+    counts = np.bincount(paper * (OTHER + 1) + etype, minlength=n * (OTHER + 1)).reshape(n, OTHER + 1)
+    now = int(time.time() * 1000) if now is None else now
+
+    rows = []
+    no_cdate = np.asarray(events.attrs.get('no_cdate', []), dtype=np.int64)
+    rows.append(_check('no_cdate', ids[no_cdate], np.ones(len(no_cdate), dtype=bool), samples))
+    gap = df['gap_days'].to_numpy(dtype=float)
+    rows.append(_check('negative_gap', ids, gap < 0, samples))
+    rows.append(_check('duplicate_decisions', ids, counts[:, DECISION] > 1, samples))
+    rows.append(_check('many_reviews', ids, counts[:, REVIEW] > max_reviews, samples, f'> {max_reviews}'))
+
+    other = etype == OTHER
+    invitation = events['invitation'].to_numpy()
+    unknown = [inv for inv in pd.unique(invitation[other]) if not any(p in '/' + inv for p in venue.known_replies)]
+    for inv in unknown:
+        rows.append(_check('unclassified_replies', ids[paper], other & (invitation == inv), samples, inv))
+    if not unknown:
+        rows.append(_check('unclassified_replies', ids, np.zeros(n, dtype=bool), samples))
+
+    t_sub = np.full(n, np.nan)
+    is_sub = etype == SUBMISSION
+    t_sub[paper[is_sub]] = cdate[is_sub]
+    rows.append(_check('reply_before_submission', ids[paper], ~is_sub & (cdate < t_sub[paper]), samples))
+    rows.append(_check('future_timestamp', ids[paper], cdate > now, samples))
+
+    valid = gap[~np.isnan(gap) & (gap >= 0)]
+    if len(valid):
+        q1, q3 = np.percentile(valid, [25, 75])
+        limit = q3 + 3 * (q3 - q1)
+        rows.append(_check('gap_outlier', ids, gap > limit, samples, f'> {limit:.1f} days'))
+    return pd.DataFrame(rows)
+
+
+def print_quality_report(report, venue_name):
+    print(f"\n=== Data Quality: {venue_name} ===")
+    print(f"{'Check':<24} {'Detail':<26} {'Count':>6}  Sample ids")
+    for _, row in report.iterrows():
+        samples = ', '.join(row['sample_ids'])
+        print(f"{row['check']:<24} {str(row['detail'])[:26]:<26} {row['count']:>6}  {samples}")
+
+
+def audit_with_quality(venue, snapshot_root=None, refresh=False, max_reviews=6, samples=5):
+    """`(records DataFrame, quality report)` from one extraction pass over the venue's notes."""
+    notes = load_notes(venue, snapshot_root=snapshot_root, refresh=refresh)
+    records = []
+    events = extract_events(notes, venue, records)
+    df = records_frame(records)
+    now = snapshot_meta(os.path.join(snapshot_root, venue.key))['fetched_at'] if snapshot_root else None
+    return df, quality_report(df, events, venue, now=now, max_reviews=max_reviews, samples=samples)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venues', default='TMLR', help=f"Comma-separated keys from: {', '.join(VENUES)}")
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--max-reviews', type=int, default=6, help='Flag papers with more reviews than this')
+    parser.add_argument('--samples', type=int, default=5, help='Sample ids per check')
+    parser.add_argument('--csv', help='Write all checks (all venues) to this CSV')
+    args = parser.parse_args()
+
+    reports = []
+    for key in args.venues.split(','):
+        venue = VENUES[key]
+        _, report = audit_with_quality(venue, snapshot_root=args.snapshots, max_reviews=args.max_reviews,
+                                       samples=args.samples)
+        print_quality_report(report, venue.name)
+        reports.append(report.assign(venue=venue.key))
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+        out = pd.concat(reports, ignore_index=True)
+        out['sample_ids'] = out['sample_ids'].str.join(' ')
+        out.to_csv(args.csv, index=False)
@@ -0,0 +1,288 @@
+"""Long-running local HTTP service for the audit reports.
+
+The records table is kept in memory and re-synced in a background thread
+(re-fetching the venue snapshot, or with `--no-fetch` just picking up a
+snapshot another process refreshed). Every report is computed once per data
+version and served from a cache that is cleared only when the synced
+records actually differ. Responses carry the version as an ETag, so a
+client's `If-None-Match` gets a 304.
+
+Endpoints:
+    /status                          data version, sync times, counts
+    /quantiles /compliance           headline statistics (JSON)
+    /yearly /rejection-by-wait       the yearly and outcome tables (JSON)
+    /images/histogram.png /images/yearly.png /images/rejection_by_wait.png
+    /images/cohort_heatmap.png
+
+Usage:
+    python audit_service.py --snapshots snapshots --port 8050 --sync-interval 3600
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import tmlr_audit
+from audit_engine import OUTCOMES, THRESHOLDS, VENUES, analysis_frame, extract_records, load_notes, records_frame
+from openreview_snapshot import snapshot_meta
+
+_PLOTS = {
+    'histogram': tmlr_audit.plot_histogram,
+    'yearly': tmlr_audit.plot_yearly,
+    'rejection_by_wait': tmlr_audit.plot_rejection_by_wait,
+    'cohort_heatmap': tmlr_audit.plot_cohort_heatmap,
+}
+
+
+def records_version(df):
+    """Content hash of a records table; unchanged data keeps the same version."""
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def quantiles_report(df, analysis):
+    gaps = analysis['gap_days']
+    return {'n': len(gaps), **{f'p{q}': gaps.quantile(q / 100) for q in [50, 75, 90, 95, 99]}}
+
+
+def compliance_report(df, analysis):
+    gaps = analysis['gap_days']
+    return {'n': len(gaps), 'censored': int(df['censored'].sum()),
+            **{f'share_gt_{t}': (gaps > t).mean() for t in THRESHOLDS}}
+
+
+def yearly_report(df, analysis):
+    return tmlr_audit.yearly_stats(analysis).to_dict(orient='records')
+
+
+def rejection_report(df, analysis):
+    outcome = tmlr_audit.outcome_frame(analysis)
+    grouped = tmlr_audit.rejection_by_wait(outcome)
+    coarse = []
+    for lo, hi in [(15, 35), (35, 55), (55, 75), (75, 100)]:
+        subset = outcome[(outcome['gap_days'] > lo) & (outcome['gap_days'] <= hi)]
+        if len(subset):
+            coarse.append({'lo': lo, 'hi': hi, 'n': len(subset), 'rejection_rate': subset['rejected'].mean()})
+    bins = [{'lo': row['bin'].left, 'hi': row['bin'].right, 'n': int(row['n']),
+             'rejection_rate': row['rejection_rate'], 'acceptance_rate': row['acceptance_rate']}
+            for _, row in grouped.iterrows()]
+    outcomes = pd.Series(np.asarray(OUTCOMES)[outcome['outcome'].to_numpy()]).value_counts()
+    return {'n': len(outcome), 'recommendations': outcome['recommendation'].value_counts().to_dict(),
+            'outcomes': outcomes.to_dict(), 'coarse': coarse, 'bins': bins}
+
+
+REPORTS = {
+    '/quantiles': quantiles_report,
+    '/compliance': compliance_report,
+    '/yearly': yearly_report,
+    '/rejection-by-wait': rejection_report,
+}
+
+
+def _json_default(x):
+    return x.item() if hasattr(x, 'item') else str(x)
+
+
+def _finite(obj):
+    """`obj` with NaN/inf floats (e.g. the statistics of an empty window) replaced by None."""
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if np.isfinite(obj) else None
+    return obj
+
+
+def _render(plot, analysis):
+    """PNG bytes of one tmlr_audit plot (they write a file and print a summary)."""
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        plot(analysis.copy(), tmp)
+        plt.close('all')
+        name = next(f for f in os.listdir(tmp) if f.endswith('.png'))
+        with open(os.path.join(tmp, name), 'rb') as f:
+            return f.read()
+
+
+class AuditService:
+    """In-memory records for one venue, a background sync loop and a per-version report cache."""
+
+    def __init__(self, venue, snapshot_root=None, fetch=True, sync_interval=3600):
+        self.venue = VENUES[venue] if isinstance(venue, str) else venue
+        self.snapshot_root = snapshot_root
+        self.fetch = fetch
+        self.sync_interval = sync_interval
+        self.version = None
+        self.synced_at = None
+        self.loaded_at = None
+        self.last_error = None
+        self._meta = None
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._load(refresh=False)
+
+    def _snapshot_meta(self):
+        if self.snapshot_root is None:
+            return None
+        return snapshot_meta(os.path.join(self.snapshot_root, self.venue.key))
+
+    def _load(self, refresh):
+        notes = load_notes(self.venue, snapshot_root=self.snapshot_root, refresh=refresh)
+        df = records_frame(extract_records(notes, self.venue))
+        version = records_version(df)
+        with self._lock:
+            self._meta = self._snapshot_meta()
+            self.synced_at = time.time()
+            if version == self.version:
+                return False
+            self.df, self.analysis = df, analysis_frame(df)
+            self.version = version
+            self.loaded_at = self.synced_at
+            self._cache = {}
+        return True
+
+    def sync(self):
+        """Re-fetch (or re-read a changed snapshot); returns True if the data changed."""
+        if not self.fetch and self.snapshot_root is not None and self._snapshot_meta() == self._meta:
+            self.synced_at = time.time()
+            return False
+        return self._load(refresh=self.fetch)
+
+    def start(self):
+        if self.sync_interval:
+            threading.Thread(target=self._sync_loop, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f'{type(e).__name__}: {e}'
+
+    def get(self, path):
+        """`(content_type, body, version)` for an endpoint, computed once per data version."""
+        with self._lock:
+            version, df, analysis = self.version, self.df, self.analysis
+            hit = self._cache.get((version, path))
+        if hit is not None:
+            return hit
+        # One report is computed at a time (pyplot is not thread-safe); waiters then hit the cache
+        with self._compute_lock:
+            hit = self._cache.get((version, path))
+            if hit is not None:
+                return hit
+            name = path[len('/images/'):-len('.png')] if path.startswith('/images/') else None
+            if path in REPORTS:
+                body = json.dumps(_finite(REPORTS[path](df, analysis)), default=_json_default,
+                                  allow_nan=False).encode()
+                entry = ('application/json; charset=utf-8', body, version)
+            elif name in _PLOTS:
+                entry = ('image/png', _render(_PLOTS[name], analysis), version)
+            else:
+                raise KeyError(path)
+            with self._lock:
+                if version == self.version:
+                    self._cache[(version, path)] = entry
+        return entry
+
+    def status(self):
+        with self._lock:
+            return {'venue': self.venue.key, 'version': self.version, 'synced_at': self.synced_at,
+                    'loaded_at': self.loaded_at, 'last_error': self.last_error, 'submissions': len(self.df),
+                    'analysis': len(self.analysis), 'cached': len(self._cache)}
+
+
+class _AuditHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, content_type, body, version=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if version:
+            self.send_header('ETag', f'"{version}"')
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/status':
+            self._send(200, 'application/json; charset=utf-8', json.dumps(self.service.status()).encode())
+            return
+        try:
+            content_type, body, version = self.service.get(path)
+        except KeyError:
+            self._send(404, 'application/json; charset=utf-8',
+                       json.dumps({'message': f'{path} is not served'}).encode())
+            return
+        if self.headers.get('If-None-Match') == f'"{version}"':
+            self._send(304, content_type, b'', version)
+        else:
+            self._send(200, content_type, body, version)
+
+
+class _AuditServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 drops connections under concurrent load
+
+
+def serve_audit(service, host='127.0.0.1', port=0):
+    """Start the service's HTTP server in a daemon thread; returns `(server, baseurl)`."""
+    handler = type('AuditHandler', (_AuditHandler,), {'service': service})
+    server = _AuditServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--sync-interval', type=float, default=3600, help='Seconds between syncs (0 disables)')
+    parser.add_argument('--no-fetch', action='store_true',
+                        help='Only reload when the snapshot on disk changes; never query the API')
+    parser.add_argument('--warm', action='store_true', help='Compute every report before serving')
+    args = parser.parse_args()
+    if args.no_fetch and not args.snapshots:
+        parser.error('--no-fetch needs --snapshots')
+
+    service = AuditService(args.venue, snapshot_root=args.snapshots, fetch=not args.no_fetch,
+                           sync_interval=args.sync_interval)
+    if args.warm:
+        for path in [*REPORTS, *(f'/images/{name}.png' for name in _PLOTS)]:
+            service.get(path)
+    server, url = serve_audit(service, host=args.host, port=args.port)
+    print(f"Serving {service.venue.name} audit ({len(service.df)} submissions, version {service.version}) at {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.stop()
+        server.shutdown()
@@ -0,0 +1,125 @@
+"""Process-sharded extraction of a venue snapshot into the records table.
+
+The snapshot's lines are split into contiguous shards and handed to a
+process pool as one raw bytes blob per shard, not as parsed notes. Each
+worker parses and extracts its shard and writes the numeric columns straight
+into shared-memory arrays at the shard's row offset; the two string columns
+(id and recommendation) come back as one joined string per shard. No per-row
+Python object crosses a process boundary, so the parent only has to split
+the file and wrap the shared arrays in a DataFrame.
+
+The table matches `records_frame(extract_records(read_snapshot(path), venue))`,
+except that time columns are always float64 (NaN when absent).
+
+Usage:
+    python audit_shards.py --snapshots snapshots --venue TMLR --workers 8
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import MS_PER_DAY, VENUES, extract_records, records_frame, snapshot_path
+from openreview_snapshot import read_snapshot
+
+# Numeric record columns written by the workers
+COLUMNS = {
+    'n_reviews': np.int64,
+    't_third_review': np.float64,
+    't_review_release': np.float64,
+    't_decision': np.float64,
+    'outcome': np.int8,
+}
+_SEP = '\0'
+
+
+def _views(shms, n):
+    return {c: np.ndarray((n,), dtype=COLUMNS[c], buffer=shms[c].buf) for c in COLUMNS}
+
+
+def _extract_shard(task):
+    """Extract one shard into the shared columns; returns its ids and recommendations."""
+    venue, blob, start, names, n = task
+    records = extract_records([json.loads(line) for line in blob.splitlines()], venue)
+    shms = {c: SharedMemory(name=names[c]) for c in COLUMNS}
+    try:
+        cols = _views(shms, n)
+        stop = start + len(records)
+        for c in COLUMNS:
+            cols[c][start:stop] = [np.nan if r[c] is None else r[c] for r in records]
+        del cols
+    finally:
+        for shm in shms.values():
+            shm.close()
+    return _SEP.join(r['id'] for r in records), _SEP.join(r['recommendation'] for r in records)
+
+
+def extract_sharded(path, venue, workers=None, shards=None):
+    """Records DataFrame of the snapshot at `path`, extracted by `workers` processes."""
+    workers = workers or os.cpu_count()
+    with gzip.open(os.path.join(path, 'notes.jsonl.gz'), 'rb') as f:
+        lines = f.read().splitlines()
+    n = len(lines)
+    bounds = np.linspace(0, n, min(shards or 4 * workers, max(n, 1)) + 1).astype(int)
+    shms = {c: SharedMemory(create=True, size=max(n * np.dtype(t).itemsize, 1)) for c, t in COLUMNS.items()}
+    try:
+        names = {c: shm.name for c, shm in shms.items()}
+        tasks = [(venue, b'\n'.join(lines[a:b]), a, names, n) for a, b in zip(bounds[:-1], bounds[1:])]
+        del lines
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            strings = list(pool.map(_extract_shard, tasks))
+        views = _views(shms, n)
+        cols = {c: views[c].copy() for c in COLUMNS}
+        del views
+    finally:
+        for shm in shms.values():
+            shm.close()
+            shm.unlink()
+    ids, recs = [], []
+    for shard_ids, shard_recs in strings:
+        if shard_ids:  # an empty shard has no records, but one record may have an empty recommendation
+            ids += shard_ids.split(_SEP)
+            recs += shard_recs.split(_SEP)
+    df = pd.DataFrame({
+        'venue': venue.key,
+        'id': ids,
+        'n_reviews': cols['n_reviews'],
+        't_third_review': cols['t_third_review'],
+        't_review_release': cols['t_review_release'],
+        't_decision': cols['t_decision'],
+        'censored': np.isnan(cols['t_decision']),
+        'recommendation': recs,
+        'outcome': cols['outcome'],
+    })
+    df['gap_days'] = (df['t_decision'] - df['t_third_review']) / MS_PER_DAY
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', default='snapshots', help='Snapshot root directory')
+    parser.add_argument('--refresh', action='store_true', help='Re-fetch the snapshot even if present')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per core)')
+    parser.add_argument('--shards', type=int, help='Number of shards (default: 4 per worker)')
+    parser.add_argument('--compare', action='store_true', help='Also time the single-process extraction')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    path = snapshot_path(venue, args.snapshots, refresh=args.refresh)
+    start = time.perf_counter()
+    df = extract_sharded(path, venue, workers=args.workers, shards=args.shards)
+    elapsed = time.perf_counter() - start
+    print(f"Sharded ({args.workers or os.cpu_count()} workers): {len(df)} submissions in {elapsed:.2f}s "
+          f"({len(df) / elapsed:,.0f}/s)")
+    if args.compare:
+        start = time.perf_counter()
+        single = records_frame(extract_records(read_snapshot(path), venue))
+        elapsed = time.perf_counter() - start
+        print(f"Single process:  {len(single)} submissions in {elapsed:.2f}s ({len(single) / elapsed:,.0f}/s)")
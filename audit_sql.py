@@ -0,0 +1,203 @@
+"""SQL (DuckDB) query surface over the extracted audit tables.
+
+Venues are loaded from their local snapshots into two tables,
+
+    submissions  one row per submission (the records table plus t_submission),
+                 `outcome` as its class ('accept', 'reject', 'other' or
+                 'none') and `outcome_detail` as its audit_engine.OUTCOMES label
+    events       one row per timestamped event (see audit_engine.extract_events)
+
+and three views built on them:
+
+    gaps         analysis rows (decided, >= 3 reviews, gap >= 0) with
+                 decision_year and decision_quarter
+    compliance   N, quantiles and >28/35/42-day shares per venue, year and quarter
+    outcomes     rejection and acceptance rates per venue and 5-day gap bin
+
+With `--db`, the tables are kept in a DuckDB file and rebuilt only when a
+venue's snapshot changes, so later queries never touch the network or
+re-extract anything.
+
+Usage:
+    python audit_sql.py --snapshots snapshots --db snapshots/audit.duckdb \\
+        "SELECT median(gap_days) FROM gaps WHERE outcome = 'accept' AND n_reviews >= 4
+         AND decision_year = 2024 AND decision_quarter = 3"
+    python audit_sql.py --snapshots snapshots --db snapshots/audit.duckdb   # interactive
+"""
+import argparse
+import os
+import sys
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from audit_engine import (EVENT_TYPES, OUTCOME_CLASS, OUTCOME_CLASSES, OUTCOMES, SUBMISSION, THRESHOLDS, VENUES,
+                          extract_events, extract_records, load_notes, records_frame)
+from openreview_snapshot import snapshot_meta
+
+# Bumped when the table layout changes; a --db file built with another version is rebuilt
+SCHEMA_VERSION = 2
+
+_VIEWS = {
+    'gaps': """
+        SELECT *,
+               year(t_decision) AS decision_year,
+               quarter(t_decision) AS decision_quarter
+        FROM submissions
+        WHERE NOT censored AND t_third_review IS NOT NULL AND gap_days >= 0
+    """,
+    'compliance': """
+        SELECT venue, decision_year, decision_quarter,
+               count(*) AS n,
+               quantile_cont(gap_days, 0.5) AS p50,
+               quantile_cont(gap_days, 0.75) AS p75,
+               quantile_cont(gap_days, 0.9) AS p90,
+               {shares}
+        FROM gaps
+        GROUP BY ALL
+        ORDER BY ALL
+    """.format(shares=',\n               '.join(f'avg((gap_days > {t})::DOUBLE) AS share_gt_{t}'
+                                                    for t in THRESHOLDS)),
+    'outcomes': """
+        SELECT venue,
+               floor(gap_days / 5) * 5 AS bin_start,
+               count(*) AS n,
+               avg((outcome = 'reject')::DOUBLE) AS rejection_rate,
+               avg((outcome = 'accept')::DOUBLE) AS acceptance_rate
+        FROM gaps
+        WHERE outcome <> 'none'
+        GROUP BY ALL
+        ORDER BY ALL
+    """,
+}
+
+
+def _timestamps(values):
+    return pd.to_datetime(pd.Series(values, dtype='float64'), unit='ms')
+
+
+def venue_tables(venue, snapshot_root):
+    """(submissions, events) DataFrames of one venue, timestamps as datetimes."""
+    notes = load_notes(venue, snapshot_root=snapshot_root)
+    df = records_frame(extract_records(notes, venue))
+    events = extract_events(notes, venue)
+
+    t_submission = np.full(len(df), np.nan)
+    sub = events[events['type'] == SUBMISSION]
+    t_submission[sub['paper'].to_numpy()] = sub['cdate'].to_numpy()
+    df.insert(2, 't_submission', t_submission)
+    codes = df.pop('outcome').to_numpy()
+    df['outcome'] = pd.Categorical.from_codes(OUTCOME_CLASS[codes], OUTCOME_CLASSES)
+    df['outcome_detail'] = pd.Categorical.from_codes(codes, OUTCOMES)
+    for col in ['t_submission', 't_third_review', 't_review_release', 't_decision']:
+        df[col] = _timestamps(df[col])
+
+    events = pd.DataFrame({
+        'venue': venue.key,
+        'id': df['id'].to_numpy()[events['paper'].to_numpy()],
+        'type': pd.Categorical.from_codes(events['type'].to_numpy(), EVENT_TYPES),
+        'cdate': _timestamps(events['cdate']),
+        'signature': events['signature'].astype(str),
+        'invitation': events['invitation'].astype(str),
+    })
+    return df, events
+
+
+def _snapshot_version(venue, snapshot_root):
+    meta = snapshot_meta(os.path.join(snapshot_root, venue.key))
+    return meta['fetched_at'], meta['n_notes']
+
+
+def connect(venues, snapshot_root='snapshots', db=None):
+    """DuckDB connection with `submissions`, `events` and the views, covering the given venues.
+
+    With `db`, a venue is re-extracted only if its snapshot changed since the
+    file was built (its snapshot is fetched first if missing).
+    """
+    venues = [VENUES[v] if isinstance(v, str) else v for v in venues]
+    con = duckdb.connect(db or ':memory:')
+    con.execute("CREATE TABLE IF NOT EXISTS audit_meta (schema_version INTEGER)")
+    if con.execute("SELECT schema_version FROM audit_meta").fetchall() != [(SCHEMA_VERSION,)]:
+        for table in ['submissions', 'events', 'sources']:
+            con.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+        con.execute("DELETE FROM audit_meta")
+        con.execute("INSERT INTO audit_meta VALUES (?)", [SCHEMA_VERSION])
+    con.execute("CREATE TABLE IF NOT EXISTS sources (venue VARCHAR PRIMARY KEY, fetched_at BIGINT, n_notes BIGINT)")
+    built = dict(con.execute("SELECT venue, (fetched_at, n_notes) FROM sources").fetchall())
+    have_tables = 'submissions' in {r[0] for r in con.execute("SHOW TABLES").fetchall()}
+
+    for venue in venues:
+        if not os.path.exists(os.path.join(snapshot_root, venue.key, 'meta.json')):
+            load_notes(venue, snapshot_root=snapshot_root)
+        version = _snapshot_version(venue, snapshot_root)
+        if have_tables and built.get(venue.key) == version:
+            continue
+        new_submissions, new_events = venue_tables(venue, snapshot_root)
+        if have_tables:
+            con.execute("DELETE FROM submissions WHERE venue = ?", [venue.key])
+            con.execute("DELETE FROM events WHERE venue = ?", [venue.key])
+            con.execute("INSERT INTO submissions SELECT * FROM new_submissions")
+            con.execute("INSERT INTO events SELECT * FROM new_events")
+        else:
+            con.execute("CREATE TABLE submissions AS SELECT * FROM new_submissions")
+            con.execute("CREATE TABLE events AS SELECT * FROM new_events")
+            have_tables = True
+        con.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", [venue.key, *version])
+
+    for name, sql in _VIEWS.items():
+        con.execute(f"CREATE OR REPLACE VIEW {name} AS {sql}")
+    return con
+
+
+def run_query(con, sql):
+    start = time.perf_counter()
+    result = con.sql(sql)
+    if result is None:
+        print(f"OK ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return
+    rows = result.fetchdf()
+    elapsed = (time.perf_counter() - start) * 1000
+    with pd.option_context('display.max_rows', 200, 'display.width', 200):
+        print(rows.to_string(index=False))
+    print(f"({len(rows)} rows, {elapsed:.1f} ms)")
+
+
+def repl(con):
+    print("Tables: submissions, events. Views: gaps, compliance, outcomes. End statements with ';'.")
+    buf = ''
+    while True:
+        try:
+            line = input('audit> ' if not buf else '  ...> ')
+        except EOFError:
+            break
+        buf += line + '\n'
+        if buf.rstrip().endswith(';'):
+            try:
+                run_query(con, buf)
+            except duckdb.Error as e:
+                print(f"Error: {e}")
+            buf = ''
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('query', nargs='*', help='SQL statements to run (default: interactive prompt)')
+    parser.add_argument('--venues', default='TMLR', help=f"Comma-separated keys from: {', '.join(VENUES)}")
+    parser.add_argument('--snapshots', default='snapshots', help='Root directory for per-venue snapshots')
+    parser.add_argument('--db', help='Keep the tables in this DuckDB file (default: in memory)')
+    args = parser.parse_args()
+
+    keys = args.venues.split(',')
+    unknown = [k for k in keys if k not in VENUES]
+    if unknown:
+        parser.error(f"unknown venue(s): {', '.join(unknown)}")
+    con = connect(keys, snapshot_root=args.snapshots, db=args.db)
+    if args.query:
+        for sql in args.query:
+            run_query(con, sql)
+    elif sys.stdin.isatty():
+        repl(con)
+    else:
+        run_query(con, sys.stdin.read())
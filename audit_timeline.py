@@ -0,0 +1,185 @@
+"""Per-paper event timelines in CSR form with vectorized interval queries.
+
+All events of a venue live in two flat arrays, `type` (int8, codes from
+`audit_engine.EVENT_TYPES`) and `cdate` (int64 ms), sorted by
+(paper, type, cdate). Paper p owns `offsets[p]:offsets[p+1]`, and a
+(paper x type) count matrix gives the start of every type block, so "the
+k-th event of type A" is one fancy-index for the whole venue and any stage
+gap is a single array subtraction.
+
+Usage:
+    python audit_timeline.py --snapshots snapshots
+    python audit_timeline.py --snapshots snapshots --gap review:1 review:3
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import (DECISION, EVENT_TYPES, MS_PER_DAY, RELEASE, REVIEW, SUBMISSION, VENUES,
+                          extract_events, load_notes, note_to_dict)
+
+# (label, (type, k), (type, k)) pairs reported by default; k is 1-based, -1 is the last event
+STAGES = [
+    ('Submission -> 1st review', (SUBMISSION, 1), (REVIEW, 1)),
+    ('1st review -> 3rd review', (REVIEW, 1), (REVIEW, 3)),
+    ('3rd review -> last review', (REVIEW, 3), (REVIEW, -1)),
+    ('3rd review -> review release', (REVIEW, 3), (RELEASE, 1)),
+    ('Review release -> decision', (RELEASE, 1), (DECISION, 1)),
+    ('3rd review -> decision', (REVIEW, 3), (DECISION, 1)),
+    ('Submission -> decision', (SUBMISSION, 1), (DECISION, 1)),
+]
+
+
+class Timeline:
+    """CSR event store: `ids[p]` owns `type/cdate[offsets[p]:offsets[p+1]]`."""
+
+    def __init__(self, ids, offsets, type, cdate):
+        self.ids = np.asarray(ids)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.type = np.asarray(type, dtype=np.int8)
+        self.cdate = np.asarray(cdate, dtype=np.int64)
+        n_types = len(EVENT_TYPES)
+        self.paper = np.repeat(np.arange(len(self.ids)), np.diff(self.offsets))
+        self.block_key = self.paper * n_types + self.type
+        self.counts = np.bincount(self.block_key, minlength=len(self.ids) * n_types).reshape(len(self.ids), n_types)
+        # Index of the first event of each (paper, type) block
+        self.block_start = self.offsets[:-1, None] + np.cumsum(self.counts, axis=1) - self.counts
+        self._time_order = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_events(cls, events, ids):
+        """Build from an `extract_events` frame; `ids[p]` is the id of paper p."""
+        paper = events['paper'].to_numpy()
+        etype = events['type'].to_numpy()
+        cdate = events['cdate'].to_numpy()
+        order = np.lexsort((cdate, etype, paper))
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(paper, minlength=len(ids)), out=offsets[1:])
+        return cls(ids, offsets, etype[order], cdate[order])
+
+    @classmethod
+    def from_notes(cls, notes, venue):
+        ids = np.array([note_to_dict(n)['id'] for n in notes], dtype=object)
+        return cls.from_events(extract_events(notes, venue), ids)
+
+    def save(self, path):
+        np.savez_compressed(path, ids=self.ids.astype(str), offsets=self.offsets, type=self.type, cdate=self.cdate)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z['ids'].astype(object), z['offsets'], z['type'], z['cdate'])
+
+    def with_counts(self, counts):
+        """View sharing this timeline's arrays but seeing only the first `counts[p, t]` events per block."""
+        view = object.__new__(Timeline)
+        view.__dict__.update(self.__dict__)
+        view.counts = counts
+        return view
+
+    def time_order(self):
+        """Event indices sorted by cdate, and the sorted cdates (computed once)."""
+        if self._time_order is None:
+            order = np.argsort(self.cdate, kind='stable')
+            self._time_order = (order, self.cdate[order])
+        return self._time_order
+
+    def as_of(self, t):
+        """The timeline as it looked at time `t` (ms): later events are unseen.
+
+        Blocks are sorted by cdate, so the visible events of each block are a
+        prefix and only the counts change. The cut is a binary search over
+        the globally sorted timestamps.
+        """
+        order, sorted_cdate = self.time_order()
+        n = np.searchsorted(sorted_cdate, t, side='right')
+        counts = np.bincount(self.block_key[order[:n]], minlength=self.counts.size).reshape(self.counts.shape)
+        return self.with_counts(counts)
+
+    def count(self, etype):
+        return self.counts[:, etype]
+
+    def kth(self, etype, k):
+        """cdate of each paper's k-th event of `etype` (1-based; -1 = last), NaN if absent."""
+        n = self.counts[:, etype]
+        pos = k - 1 if k > 0 else n + k
+        ok = (pos >= 0) & (pos < n)
+        out = np.full(len(self.ids), np.nan)
+        out[ok] = self.cdate[self.block_start[ok, etype] + (pos[ok] if np.ndim(pos) else pos)]
+        return out
+
+    def first(self, etype):
+        return self.kth(etype, 1)
+
+    def last(self, etype):
+        return self.kth(etype, -1)
+
+    def gap(self, a, b, ka=1, kb=1):
+        """Days from the ka-th event of type a to the kb-th event of type b, per paper."""
+        return (self.kth(b, kb) - self.kth(a, ka)) / MS_PER_DAY
+
+    def frame(self):
+        """Wide per-paper table of the commonly used milestones."""
+        return pd.DataFrame({
+            'id': self.ids,
+            'n_reviews': self.count(REVIEW),
+            'n_decisions': self.count(DECISION),
+            't_submission': self.first(SUBMISSION),
+            't_first_review': self.first(REVIEW),
+            't_third_review': self.kth(REVIEW, 3),
+            't_last_review': self.last(REVIEW),
+            't_review_release': self.first(RELEASE),
+            't_decision': self.first(DECISION),
+        })
+
+
+def parse_event(spec):
+    """'review:3' -> (REVIEW, 3); 'decision' -> (DECISION, 1); 'review:last' -> (REVIEW, -1)."""
+    name, _, k = spec.partition(':')
+    if name not in EVENT_TYPES:
+        raise ValueError(f"{spec!r}: event type must be one of {', '.join(EVENT_TYPES)}")
+    if k == 'last':
+        return EVENT_TYPES.index(name), -1
+    if k and not (k.isdigit() and int(k) >= 1):
+        raise ValueError(f"{spec!r}: k must be a positive integer or 'last'")
+    return EVENT_TYPES.index(name), int(k or 1)
+
+
+def print_stage_report(timeline, stages=STAGES):
+    print(f"\n=== Stage Durations (days, {len(timeline)} submissions) ===")
+    print(f"{'Stage':<32} {'N':>6} {'Median':>7} {'75th':>7} {'90th':>7}")
+    for label, (a, ka), (b, kb) in stages:
+        gaps = timeline.gap(a, b, ka, kb)
+        gaps = gaps[~np.isnan(gaps) & (gaps >= 0)]
+        if not len(gaps):
+            print(f"{label:<32} {0:>6}")
+            continue
+        p50, p75, p90 = np.percentile(gaps, [50, 75, 90])
+        print(f"{label:<32} {len(gaps):>6} {p50:>7.1f} {p75:>7.1f} {p90:>7.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--gap', nargs=2, metavar=('FROM', 'TO'),
+                        help="Report one custom gap, e.g. 'review:1 decision' (type[:k], k=last allowed)")
+    parser.add_argument('--save', help='Write the timeline to this .npz file')
+    args = parser.parse_args()
+
+    stages = STAGES
+    if args.gap:
+        try:
+            (a, ka), (b, kb) = parse_event(args.gap[0]), parse_event(args.gap[1])
+        except ValueError as e:
+            parser.error(f'--gap: {e}')
+        stages = [(f'{args.gap[0]} -> {args.gap[1]}', (a, ka), (b, kb))]
+    venue = VENUES[args.venue]
+    timeline = Timeline.from_notes(load_notes(venue, snapshot_root=args.snapshots), venue)
+    print_stage_report(timeline, stages)
+    if args.save:
+        timeline.save(args.save)
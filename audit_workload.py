@@ -0,0 +1,213 @@
+"""Action-editor and reviewer workload analytics.
+
+Reply signatures (e.g. `TMLR/Paper{N}/Action_Editors`, `TMLR/Paper{N}/Reviewer_xxxx`,
+or `~Profile_Id1` at venues that sign with profiles) are factorized into
+integer ids. Each (signature, paper) assignment becomes an interval:
+
+    editor    third review (submission if fewer than 3) -> decision, or open
+    reviewer  submission -> the reviewer's review
+
+Concurrent load is counted with a sweep line over sorted interval endpoints
+(`searchsorted` on entity-offset keys), never pairwise, so the cost is
+O(E log E) in the number of reply events. Note that venues with per-paper
+anonymous signatures identify a role on one paper rather than a person.
+
+Usage:
+    python audit_workload.py --venue TMLR --snapshots snapshots
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from audit_engine import (DECISION, MS_PER_DAY, REVIEW, SUBMISSION, VENUES, extract_events,
+                          extract_records, load_notes, records_frame)
+
+ROLES = ['other', 'action_editor', 'reviewer', 'author', 'profile']
+_ROLE_PATTERNS = [
+    ('action_editor', r'/Action_Editors?(?:_|$)'),
+    ('reviewer', r'/Reviewers?(?:_|$)'),
+    ('author', r'/Authors$'),
+    ('profile', r'^~'),
+]
+
+
+def index_signatures(events):
+    """Integer id per distinct signature, plus a role code per id.
+
+    Returns `(sig_id, names, role)` where `sig_id` aligns with `events` rows,
+    `names[k]` is the signature string of id k and `role[k]` indexes ROLES.
+    """
+    sig_id, names = pd.factorize(events['signature'].astype(str), sort=True)
+    names = pd.Index(names)
+    role = np.zeros(len(names), dtype=np.int8)
+    for label, pattern in _ROLE_PATTERNS:
+        hit = names.str.contains(pattern, regex=True) & (role == 0)
+        role[np.asarray(hit)] = ROLES.index(label)
+    return sig_id.astype(np.int32), names, role
+
+
+def assignment_intervals(events, df, as_of=None):
+    """Editor and reviewer intervals as a DataFrame (entity, paper, start, end, role, delay_days).
+
+    Open editor intervals (no decision yet) end at `as_of`, which defaults to
+    the latest event time.
+    """
+    sig_id, names, role = index_signatures(events)
+    etype = events['type'].to_numpy()
+    paper = events['paper'].to_numpy()
+    cdate = events['cdate'].to_numpy()
+    as_of = cdate.max() if as_of is None else as_of
+
+    submitted = np.full(len(df), -1, dtype=np.int64)
+    sub_mask = etype == SUBMISSION
+    submitted[paper[sub_mask]] = cdate[sub_mask]
+
+    # Reviewers: one interval per review signed by a reviewer, submission -> review
+    rev = (etype == REVIEW) & (submitted[paper] >= 0) & (role[sig_id] == ROLES.index('reviewer'))
+    reviewers = pd.DataFrame({
+        'entity': sig_id[rev], 'paper': paper[rev],
+        'start': submitted[paper[rev]], 'end': cdate[rev], 'role': 'reviewer',
+    })
+
+    # Editors: the decision's signer, else any action-editor signature on the paper
+    is_ae = role[sig_id] == ROLES.index('action_editor')
+    cand = (etype == DECISION) | is_ae
+    editors = pd.DataFrame({'paper': paper[cand], 'entity': sig_id[cand], 'rank': (etype[cand] != DECISION)})
+    editors = editors.sort_values(['paper', 'rank'], kind='stable').drop_duplicates('paper')
+    p = editors['paper'].to_numpy()
+    t_third = df['t_third_review'].to_numpy(dtype=float)[p]
+    t_dec = df['t_decision'].to_numpy(dtype=float)[p]
+    start = np.where(np.isnan(t_third), submitted[p], t_third).astype(np.int64)
+    end = np.where(np.isnan(t_dec), as_of, t_dec).astype(np.int64)
+    editors = pd.DataFrame({'entity': editors['entity'].to_numpy(), 'paper': p,
+                            'start': start, 'end': end, 'role': 'action_editor',
+                            'open': np.isnan(t_dec)})
+    editors = editors[(start >= 0) & (end >= start)]
+
+    intervals = pd.concat([editors, reviewers.assign(open=False)], ignore_index=True)
+    intervals['delay_days'] = (intervals['end'] - intervals['start']) / MS_PER_DAY
+    intervals['name'] = names[intervals['entity'].to_numpy()]
+    return intervals
+
+
+def _keys(entity, t, t0, span):
+    return entity.astype(np.int64) * span + (t - t0)
+
+
+def concurrent_load(entity, start, end, at=None):
+    """Open intervals of the same entity at each query time (default: each start).
+
+    Intervals are half-open [start, end). Each entity's times are shifted into
+    its own key range, so one `searchsorted` over all start keys minus one
+    over all end keys counts the open intervals per entity: every entity
+    contributes as many starts as ends, so the counts below its range cancel.
+    """
+    entity = np.asarray(entity)
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    at = start if at is None else np.asarray(at, dtype=np.int64)
+    t0 = min(start.min(), at.min())
+    span = max(end.max(), at.max()) - t0 + 1
+    s_keys = np.sort(_keys(entity, start, t0, span))
+    e_keys = np.sort(_keys(entity, end, t0, span))
+    q = _keys(entity, at, t0, span)
+    return np.searchsorted(s_keys, q, side='right') - np.searchsorted(e_keys, q, side='right')
+
+
+def load_timeseries(entity, start, end):
+    """Step-function load per entity from one sorted sweep.
+
+    Returns `(ids, offsets, times, load)`: entity `ids[k]` owns
+    `times[offsets[k]:offsets[k+1]]`, and `load` is its number of open
+    intervals from each time until the next.
+    """
+    entity = np.asarray(entity)
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    ent = np.concatenate([entity, entity])
+    t = np.concatenate([start, end])
+    delta = np.concatenate([np.ones(len(start), np.int64), -np.ones(len(end), np.int64)])
+    order = np.lexsort((delta, t, ent))  # ends before starts at equal times
+    ent, t, delta = ent[order], t[order], delta[order]
+    load = np.cumsum(delta)
+    ids, first = np.unique(ent, return_index=True)
+    offsets = np.append(first, len(ent))
+    return ids, offsets, t, load
+
+
+def entity_summary(intervals, role):
+    """Per-entity assignment counts, delay quantiles and concurrent-load stats."""
+    sub = intervals[intervals['role'] == role]
+    ids, offsets, _, load = load_timeseries(sub['entity'], sub['start'], sub['end'])
+    peak = np.maximum.reduceat(load, offsets[:-1]) if len(load) else np.array([])
+    closed = sub[~sub['open']]
+    g = closed.groupby('entity')['delay_days']
+    summary = pd.DataFrame({
+        'name': sub.groupby('entity')['name'].first(),
+        'assignments': sub.groupby('entity').size(),
+        'open': sub.groupby('entity')['open'].sum(),
+        'median_delay': g.median(),
+        'p90_delay': g.quantile(0.9),
+        'mean_load_at_start': sub.groupby('entity')['load_at_start'].mean(),
+    })
+    summary['peak_load'] = pd.Series(peak, index=ids)
+    return summary.sort_values('median_delay', ascending=False)
+
+
+def load_vs_delay(intervals, role, max_load=5):
+    """Median and mean delay of closed assignments bucketed by load at start."""
+    sub = intervals[(intervals['role'] == role) & ~intervals['open']]
+    bucket = sub['load_at_start'].clip(upper=max_load)
+    return sub.groupby(bucket)['delay_days'].agg(['size', 'median', 'mean'])
+
+
+def workload(events, df, as_of=None):
+    """Editor and reviewer intervals with each one's concurrent load at its start."""
+    intervals = assignment_intervals(events, df, as_of=as_of)
+    intervals['load_at_start'] = 0
+    for role in ['action_editor', 'reviewer']:
+        mask = (intervals['role'] == role).to_numpy()
+        sub = intervals[mask]
+        if len(sub):
+            intervals.loc[mask, 'load_at_start'] = concurrent_load(sub['entity'], sub['start'], sub['end'])
+    return intervals
+
+
+def print_workload_report(intervals, top=15):
+    for role, label in [('action_editor', 'Action Editor'), ('reviewer', 'Reviewer')]:
+        sub = intervals[intervals['role'] == role]
+        if not len(sub):
+            continue
+        summary = entity_summary(intervals, role)
+        print(f"\n=== {label} Workload ({len(summary)} signatures, {len(sub)} assignments) ===")
+        print(f"{'Signature':<40} {'N':>5} {'Open':>5} {'Median':>7} {'P90':>7} {'Load':>5} {'Peak':>5}")
+        for _, row in summary.head(top).iterrows():
+            print(f"{row['name'][-40:]:<40} {row['assignments']:>5} {row['open']:>5} "
+                  f"{row['median_delay']:>7.1f} {row['p90_delay']:>7.1f} "
+                  f"{row['mean_load_at_start']:>5.1f} {row['peak_load']:>5.0f}")
+        print(f"\n  Delay by concurrent load at assignment start ({label.lower()}):")
+        for load, row in load_vs_delay(intervals, role).iterrows():
+            tag = f"{load}+" if load == 5 else str(load)
+            print(f"    load {tag:>3}: N={int(row['size']):>6}, median={row['median']:.1f} days, "
+                  f"mean={row['mean']:.1f} days")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--snapshots', help='Snapshot root directory (default: query the API)')
+    parser.add_argument('--top', type=int, default=15, help='Slowest signatures to list per role')
+    parser.add_argument('--out', help='Write the interval table to this CSV')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    notes = load_notes(venue, snapshot_root=args.snapshots)
+    df = records_frame(extract_records(notes, venue))
+    events = extract_events(notes, venue)
+    intervals = workload(events, df)
+    print_workload_report(intervals, top=args.top)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        intervals.to_csv(args.out, index=False)
@@ -0,0 +1,163 @@
+"""Failure-mode classification and fast-fail detection for experiment runs.
+
+`classify_run` labels a results-log record (or a final assistant message) as
+one of FAILURE_MODES from its output preview, `has_output`, `turn_count` and
+`elapsed_seconds`. `FastFailMonitor` watches the labels of finished runs and
+tells the orchestrator to back off, or to stop the batch, once fast failures
+spike or credit runs out.
+
+Usage:
+    python experiment_failures.py tmlr_experiment/experiment_results.jsonl
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+
+# Runs that stopped this fast without output never reached the model
+INSTANT_FAILURE_SECONDS = 1.0
+
+FAILURE_MODES = [
+    'ok',
+    'credit_exhaustion',
+    'timeout',
+    'api_signature_error',
+    'api_validation_error',
+    'rate_limit',
+    'exit_error',
+    'empty_output',
+]
+
+_CREDIT = re.compile(r'credit balance|insufficient[_ ](credit|quota|funds)|billing|payment required'
+                     r'|exceeded your current quota', re.IGNORECASE)
+_TIMEOUT = re.compile(r'^\[Timeout: exceeded')
+_SIGNATURE = re.compile(r'TypeError: [\w.]+\(\) (got an unexpected|got multiple values|missing \d+ required'
+                        r'|takes \d+ positional)')
+_VALIDATION = re.compile(r"ValidationError|'status': 400")
+_RATE_LIMIT = re.compile(r'RateLimitError|Too many requests')
+_ERROR_PREFIX = re.compile(r'^(\[Exit code: -?\d+\]|Error:|Traceback)')
+
+
+def classify_run(record=None, text=None):
+    """Return the failure mode of one run.
+
+    Pass a results-log `record`, or just the final output `text` (e.g. the
+    last assistant message of a conversation trace).
+    """
+    record = record or {}
+    if text is None:
+        text = record.get('final_output_preview') or ''
+    text = text.strip()
+    if _CREDIT.search(text) and (_ERROR_PREFIX.match(text) or len(text) < 500):
+        return 'credit_exhaustion'
+    if _TIMEOUT.match(text):
+        return 'timeout'
+    if _ERROR_PREFIX.match(text):
+        if _SIGNATURE.search(text):
+            return 'api_signature_error'
+        if _VALIDATION.search(text):
+            return 'api_validation_error'
+        if _RATE_LIMIT.search(text):
+            return 'rate_limit'
+        return 'exit_error'
+    if not text or record.get('has_output') is False:
+        return 'empty_output'
+    return 'ok'
+
+
+def is_fast_fail(record):
+    """A run that ended without output before the agent could do anything."""
+    return (not record.get('has_output')
+            and (record.get('elapsed_seconds') or 0) < INSTANT_FAILURE_SECONDS
+            and (record.get('turn_count') or 0) <= 1)
+
+
+class FastFailMonitor:
+    """Sliding-window fast-fail tracker that gates an orchestrator's workers.
+
+    When at least `threshold` of the last `window` runs (and `min_runs` of
+    them) fast-failed, new runs are held back for `backoff` seconds, doubling
+    on every further spike up to `max_backoff`. After `max_backoffs`
+    consecutive spikes, or on any credit exhaustion, the batch is stopped.
+    Thread-safe: `wait()` is called by the workers, `observe()` by the
+    collector.
+    """
+
+    def __init__(self, window=10, threshold=0.5, min_runs=5, backoff=30.0, max_backoff=600.0,
+                 max_backoffs=3):
+        self.recent = deque(maxlen=window)
+        self.threshold = threshold
+        self.min_runs = min_runs
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_backoffs = max_backoffs
+        self.n_backoffs = 0
+        self.resume_at = 0.0
+        self.stopped = None
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def fast_fail_rate(self):
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def observe(self, record):
+        """Record a finished run; returns 'continue', 'backoff' or 'stop'."""
+        mode = classify_run(record)
+        with self._lock:
+            self.counts[mode] += 1
+            self.recent.append(is_fast_fail(record))
+            if mode == 'credit_exhaustion':
+                self.stopped = 'credit exhausted'
+                return 'stop'
+            if len(self.recent) < self.min_runs or self.fast_fail_rate() < self.threshold:
+                if not self.recent[-1]:
+                    self.n_backoffs = 0
+                return 'continue'
+            if self.n_backoffs >= self.max_backoffs:
+                self.stopped = f'fast-fail rate {self.fast_fail_rate():.0%} after {self.n_backoffs} backoffs'
+                return 'stop'
+            delay = min(self.backoff * 2 ** self.n_backoffs, self.max_backoff)
+            self.n_backoffs += 1
+            self.resume_at = max(self.resume_at, time.time() + delay)
+            self.recent.clear()
+            return 'backoff'
+
+    def wait(self):
+        """Block a worker until any backoff has passed; False if the batch was stopped."""
+        while True:
+            with self._lock:
+                if self.stopped:
+                    return False
+                delay = self.resume_at - time.time()
+            if delay <= 0:
+                return True
+            time.sleep(min(delay, 1.0))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help='experiment_results.jsonl')
+    parser.add_argument('--verbose', action='store_true', help='Print the label of every run')
+    args = parser.parse_args()
+
+    with open(args.log) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    by_model = {}
+    for r in records:
+        mode = classify_run(r)
+        stats = by_model.setdefault(r['model_key'], Counter())
+        stats[mode] += 1
+        stats['fast_fail'] += is_fast_fail(r)
+        if args.verbose:
+            print(f"  {r['model_key']} run {r['run_idx']:02d} {r['elapsed_seconds']:>7.1f}s  {mode}")
+
+    print(f"\n=== Failure Modes ({len(records)} runs) ===")
+    for model, stats in sorted(by_model.items()):
+        n = sum(stats[m] for m in FAILURE_MODES)
+        print(f"\n  {model} (n={n}, fast-fail rate {stats['fast_fail'] / n * 100:.1f}%)")
+        for mode in FAILURE_MODES:
+            if stats[mode]:
+                print(f"    {mode:<22s} {stats[mode]:>4d}  ({stats[mode] / n * 100:.1f}%)")
@@ -0,0 +1,220 @@
+"""Incremental, indexed columnar store over an `experiment_results.jsonl` log.
+
+`ExperimentIndex.ingest()` reads only the bytes appended to the log since the
+last call, writes them as a new Parquet segment and extends the indexes
+(row ids per model and per (model, run), and timestamp order). Aggregate
+queries then load just the columns they need.
+
+Usage:
+    python experiment_index.py tmlr_experiment/experiment_results.jsonl
+    python experiment_index.py tmlr_experiment/experiment_results.jsonl --include-instant
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from experiment_failures import INSTANT_FAILURE_SECONDS, classify_run
+
+SCHEMA_VERSION = 1
+
+USAGE_FIELDS = ['input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens']
+
+SCHEMA = pa.schema([
+    ('model_key', pa.string()),
+    ('model_name', pa.string()),
+    ('run_idx', pa.int32()),
+    ('conversation_id', pa.string()),
+    ('turn_count', pa.int32()),
+    *[(f, pa.int64()) for f in USAGE_FIELDS],
+    ('estimated_cost_usd', pa.float64()),
+    ('elapsed_seconds', pa.float64()),
+    ('has_output', pa.bool_()),
+    ('timestamp', pa.timestamp('ms')),
+    ('project_dir', pa.string()),
+    ('final_output_preview', pa.string()),
+])
+
+
+def _flatten(record):
+    usage = record.get('usage') or {}
+    row = {name: record.get(name) for name in SCHEMA.names if name not in USAGE_FIELDS}
+    row.update({f: usage.get(f) for f in USAGE_FIELDS})
+    if row['timestamp'] is not None:
+        row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+    return row
+
+
+class ExperimentIndex:
+    """Append-only Parquet segments plus model/run/timestamp indexes for one log."""
+
+    def __init__(self, source, root=None):
+        self.source = source
+        self.root = root or source + '.index'
+        os.makedirs(self.root, exist_ok=True)
+        self.state_path = os.path.join(self.root, 'state.json')
+        self.state = self._load_state()
+
+    def _empty_state(self):
+        return {'schema_version': SCHEMA_VERSION, 'offset': 0, 'n_rows': 0, 'head': '',
+                'segments': [], 'by_model': {}, 'by_run': {}}
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get('schema_version') == SCHEMA_VERSION:
+                return state
+        return self._empty_state()
+
+    def _save_state(self):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def _reset(self):
+        for seg in self.state['segments']:
+            path = os.path.join(self.root, seg)
+            if os.path.exists(path):
+                os.remove(path)
+        self.state = self._empty_state()
+
+    def ingest(self):
+        """Index lines appended since the last call; returns the number of new rows.
+
+        A trailing line without a newline is left for the next call. If the
+        log was truncated or rewritten, the index is rebuilt from scratch.
+        """
+        size = os.path.getsize(self.source)
+        with open(self.source, 'rb') as f:
+            head = f.readline()[:256].decode('utf-8', 'replace')
+            if size < self.state['offset'] or (self.state['head'] and head != self.state['head']):
+                self._reset()
+            f.seek(self.state['offset'])
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        lines = [line for line in data[:end].splitlines() if line.strip()]
+        if not lines:
+            return 0
+
+        rows = [_flatten(json.loads(line)) for line in lines]
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        seg = f"segment_{len(self.state['segments']):05d}.parquet"
+        pq.write_table(table, os.path.join(self.root, seg), compression='zstd')
+
+        base = self.state['n_rows']
+        for i, row in enumerate(rows, base):
+            self.state['by_model'].setdefault(row['model_key'], []).append(i)
+            self.state['by_run'].setdefault(f"{row['model_key']}/{row['run_idx']}", []).append(i)
+        ts = np.array([r['timestamp'] for r in rows], dtype='datetime64[ms]').astype(np.int64)
+        self._extend_time_index(ts, base)
+
+        self.state['segments'].append(seg)
+        self.state['offset'] += end
+        self.state['n_rows'] += len(rows)
+        self.state['head'] = head
+        self._save_state()
+        return len(rows)
+
+    def _extend_time_index(self, ts, base):
+        path = os.path.join(self.root, 'timestamps.npy')
+        order_path = os.path.join(self.root, 'time_order.npy')
+        if base:
+            ts = np.concatenate([np.load(path), ts])
+        np.save(path, ts)
+        np.save(order_path, np.argsort(ts, kind='stable'))
+
+    def columns(self, names):
+        """Load the named columns across all segments as numpy arrays."""
+        paths = [os.path.join(self.root, s) for s in self.state['segments']]
+        if not paths:
+            return {n: np.array([]) for n in names}
+        table = pa.concat_tables(pq.read_table(p, columns=list(names)) for p in paths)
+        return {n: table.column(n).to_numpy(zero_copy_only=False) for n in names}
+
+    def rows(self, model=None, run=None, since=None, until=None):
+        """Row ids matching a model, a (model, run) pair and/or a timestamp range."""
+        if model is not None and run is not None:
+            ids = np.array(self.state['by_run'].get(f'{model}/{run}', []), dtype=np.int64)
+        elif model is not None:
+            ids = np.array(self.state['by_model'].get(model, []), dtype=np.int64)
+        else:
+            ids = np.arange(self.state['n_rows'])
+        if since is not None or until is not None:
+            ts = np.load(os.path.join(self.root, 'timestamps.npy'))
+            order = np.load(os.path.join(self.root, 'time_order.npy'))
+            lo = 0 if since is None else np.searchsorted(ts[order], _to_ms(since), side='left')
+            hi = len(order) if until is None else np.searchsorted(ts[order], _to_ms(until), side='right')
+            ids = np.intersect1d(ids, order[lo:hi])
+        return ids
+
+    def summary(self, exclude_instant=True, since=None, until=None):
+        """Per-model cost, token usage, elapsed-time percentiles and failure rates.
+
+        A run counts as failed when `experiment_failures.classify_run` labels
+        it anything but 'ok' (error exits have output, so `has_output` alone
+        misses them).
+        """
+        cols = self.columns(['elapsed_seconds', 'has_output', 'final_output_preview', 'estimated_cost_usd',
+                             *USAGE_FIELDS])
+        instant = (cols['elapsed_seconds'] < INSTANT_FAILURE_SECONDS) & ~cols['has_output'].astype(bool)
+        failed = np.array([classify_run({'final_output_preview': text, 'has_output': bool(has)}) != 'ok'
+                           for text, has in zip(cols['final_output_preview'], cols['has_output'])], dtype=bool)
+        out = {}
+        for model in sorted(self.state['by_model']):
+            ids = self.rows(model=model, since=since, until=until)
+            if not len(ids):
+                continue
+            n_instant = int(instant[ids].sum())
+            if exclude_instant:
+                ids = ids[~instant[ids]]
+            elapsed = cols['elapsed_seconds'][ids]
+            cost = np.nan_to_num(cols['estimated_cost_usd'][ids].astype(float))
+            out[model] = {
+                'runs': len(ids),
+                'instant_failures': n_instant,
+                'failure_rate': float(failed[ids].mean()) if len(ids) else float('nan'),
+                'cost_total': float(cost.sum()),
+                'cost_mean': float(cost.mean()) if len(ids) else float('nan'),
+                'tokens': {f: int(np.nan_to_num(cols[f][ids].astype(float)).sum()) for f in USAGE_FIELDS},
+                'elapsed_p50': _pct(elapsed, 50),
+                'elapsed_p90': _pct(elapsed, 90),
+                'elapsed_p99': _pct(elapsed, 99),
+            }
+        return out
+
+
+def _pct(x, q):
+    return float(np.percentile(x, q)) if len(x) else float('nan')
+
+
+def _to_ms(t):
+    return np.datetime64(t, 'ms').astype(np.int64)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help='experiment_results.jsonl')
+    parser.add_argument('--index', help='Index directory (default: <log>.index)')
+    parser.add_argument('--include-instant', action='store_true', help='Keep runs that failed instantly')
+    parser.add_argument('--since', help='ISO timestamp lower bound')
+    parser.add_argument('--until', help='ISO timestamp upper bound')
+    args = parser.parse_args()
+
+    index = ExperimentIndex(args.log, args.index)
+    new = index.ingest()
+    print(f"Ingested {new} new runs ({index.state['n_rows']} total)")
+    summary = index.summary(exclude_instant=not args.include_instant, since=args.since, until=args.until)
+
+    print(f"\n{'Model':<12} {'Runs':>5} {'Inst':>5} {'Fail%':>6} {'Cost$':>8} {'Mean$':>6} "
+          f"{'In tok':>10} {'Out tok':>9} {'p50 s':>7} {'p90 s':>7} {'p99 s':>7}")
+    for model, s in summary.items():
+        print(f"{model:<12} {s['runs']:>5} {s['instant_failures']:>5} {s['failure_rate'] * 100:>5.1f}% "
+              f"{s['cost_total']:>8.2f} {s['cost_mean']:>6.2f} {s['tokens']['input_tokens']:>10,} "
+              f"{s['tokens']['output_tokens']:>9,} {s['elapsed_p50']:>7.1f} {s['elapsed_p90']:>7.1f} "
+              f"{s['elapsed_p99']:>7.1f}")
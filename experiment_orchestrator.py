@@ -0,0 +1,256 @@
+"""Run audit replicates concurrently against one shared OpenReview snapshot.
+
+Every replicate is a shell command (an agent harness, or a scratch script)
+run in its own project directory. The orchestrator fetches the venue once
+into a snapshot, serves it with `openreview_snapshot.serve_snapshot`, and
+points every `openreview.api.OpenReviewClient` created inside a replicate at
+that server, whatever baseurl the script passes. Runs are scheduled over a
+bounded worker pool and each finished run is appended to the results log in
+the same schema as `tmlr_experiment/experiment_results.jsonl`.
+
+With `--cassette`, replicates talk to the live API instead, through one
+shared record/replay cassette (see openreview_cassette.py): the first run of
+a request records it and every later identical request, from any replicate,
+is answered locally. `--replay` makes the batch network-free.
+
+A command can report token usage by writing `usage.json` into its project
+directory (`{"usage": {...}, "turn_count": N, "conversation_id": ...}`);
+cost is then estimated from PRICES_PER_MTOK.
+
+Usage:
+    python experiment_orchestrator.py --snapshot snapshots/tmlr --workers 8 \\
+        --models opus-4.5,opus-4.6 --runs 25 \\
+        --command "python run_agent.py --model {model_key} --out {project_dir}"
+    python experiment_orchestrator.py --snapshot snapshots/tmlr --scripts tmlr_experiment/*/scratch.py
+    python experiment_orchestrator.py --cassette cassettes/tmlr.sqlite --scripts tmlr_experiment/*/scratch.py
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from experiment_failures import FastFailMonitor, classify_run
+from openreview_cassette import Cassette, cassette_env, write_shim
+from openreview_snapshot import Snapshot, fetch_snapshot, serve_snapshot
+
+# USD per million (input, output) tokens
+PRICES_PER_MTOK = {
+    'opus-4.5': (5.0, 25.0),
+    'opus-4.6': (5.0, 25.0),
+}
+
+PREVIEW_CHARS = 500
+
+# Appended to the cassette shim's sitecustomize.py on each replicate's PYTHONPATH:
+# with a snapshot, every client is redirected to the shared snapshot server
+# regardless of the baseurl it asks for.
+_CLIENT_SHIM = '''\
+import os
+try:
+    import openreview.api
+except ImportError:
+    pass
+else:
+    if os.environ.get('OPENREVIEW_SNAPSHOT_URL'):
+        _init = openreview.api.OpenReviewClient.__init__
+
+        def __init__(self, baseurl=None, *args, **kwargs):
+            _init(self, os.environ['OPENREVIEW_SNAPSHOT_URL'], *args, **kwargs)
+
+        openreview.api.OpenReviewClient.__init__ = __init__
+'''
+
+
+def estimate_cost(model_key, usage):
+    if not usage or model_key not in PRICES_PER_MTOK:
+        return None
+    price_in, price_out = PRICES_PER_MTOK[model_key]
+    return round((usage.get('input_tokens', 0) * price_in + usage.get('output_tokens', 0) * price_out) / 1e6, 6)
+
+
+def run_replicate(replicate, snapshot_url, shim_dir, timeout, cassette=None, replay=False):
+    """Run one replicate command and return its results-log record.
+
+    Clients are pointed at `snapshot_url`, or with `cassette` at the live API
+    through that cassette.
+    """
+    project_dir = replicate['project_dir']
+    os.makedirs(project_dir, exist_ok=True)
+    env = cassette_env(cassette, replay) if cassette else dict(os.environ)
+    if snapshot_url:
+        env['OPENREVIEW_SNAPSHOT_URL'] = snapshot_url
+    env['PYTHONPATH'] = os.pathsep.join(p for p in [shim_dir, env.get('PYTHONPATH')] if p)
+    usage_path = os.path.join(project_dir, 'usage.json')
+    if os.path.exists(usage_path):
+        os.remove(usage_path)
+
+    start = time.time()
+    has_output = False
+    try:
+        proc = subprocess.run(replicate['command'], shell=True, cwd=project_dir, env=env,
+                              capture_output=True, text=True, timeout=timeout)
+        # Only stdout counts as output: a crash still leaves its traceback on stderr
+        has_output = bool(proc.stdout.strip())
+        output = (proc.stdout + proc.stderr).strip()
+        if proc.returncode != 0:
+            output = f"[Exit code: {proc.returncode}]\n{output}"
+        exit_code = proc.returncode
+    except subprocess.TimeoutExpired:
+        output = f"[Timeout: exceeded {timeout:g}s]"
+        exit_code = None
+    elapsed = time.time() - start
+
+    usage_info = {}
+    if os.path.exists(usage_path):
+        with open(usage_path) as f:
+            usage_info = json.load(f)
+    usage = usage_info.get('usage')
+    return {
+        'model_key': replicate['model_key'],
+        'run_idx': replicate['run_idx'],
+        'conversation_id': usage_info.get('conversation_id'),
+        'turn_count': usage_info.get('turn_count'),
+        'usage': usage,
+        'estimated_cost_usd': estimate_cost(replicate['model_key'], usage),
+        'elapsed_seconds': round(elapsed, 1),
+        'has_output': has_output,
+        'exit_code': exit_code,
+        'final_output_preview': output[:PREVIEW_CHARS],
+        'project_dir': project_dir,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def run_experiment(replicates, snapshot_path, results_path, workers=4, timeout=600,
+                   invitation='TMLR/-/Submission', on_result=None, monitor=None, cassette=None, replay=False):
+    """Run all replicates over a bounded pool against one shared snapshot.
+
+    The snapshot is fetched only if `snapshot_path` does not exist yet. With
+    `cassette` (and no `snapshot_path`) the replicates share a record/replay
+    cassette of the live API instead. Each
+    record is labelled with its failure mode and appended to `results_path`
+    as soon as its run finishes. A `FastFailMonitor` holds back or stops
+    pending runs when fast failures spike; `on_result(record)` may also
+    return False to stop scheduling further runs.
+    """
+    server = url = None
+    if snapshot_path:
+        if not os.path.exists(os.path.join(snapshot_path, 'notes.jsonl.gz')):
+            print(f"Fetching snapshot into {snapshot_path}...")
+            fetch_snapshot(snapshot_path, invitation=invitation)
+        server, url = serve_snapshot(Snapshot(snapshot_path))
+    shim = tempfile.TemporaryDirectory(prefix='openreview_shim_')
+    shim_dir = write_shim(shim.name, extra=_CLIENT_SHIM)
+    write_lock = threading.Lock()
+    stop = threading.Event()
+    records = []
+
+    def task(replicate):
+        if monitor is not None and not monitor.wait():
+            return None
+        if stop.is_set():
+            return None
+        return run_replicate(replicate, url, shim_dir, timeout, cassette, replay)
+
+    start = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(task, r) for r in replicates]
+            for future in as_completed(futures):
+                record = future.result()
+                if record is None:
+                    continue
+                record['failure_mode'] = classify_run(record)
+                records.append(record)
+                with write_lock, open(results_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+                print(f"  {record['model_key']} run {record['run_idx']:02d}: "
+                      f"{record['elapsed_seconds']:.1f}s, {record['failure_mode']}")
+                if monitor is not None:
+                    action = monitor.observe(record)
+                    if action == 'backoff':
+                        print(f"  Fast-fail spike: holding new runs for "
+                              f"{max(monitor.resume_at - time.time(), 0):.0f}s")
+                    elif action == 'stop':
+                        print(f"  Stopping batch: {monitor.stopped}")
+                if on_result is not None and on_result(record) is False:
+                    stop.set()
+    finally:
+        shim.cleanup()
+        if server is not None:
+            server.shutdown()
+
+    wall = time.time() - start
+    total = sum(r['elapsed_seconds'] for r in records)
+    if server is not None:
+        source = f"{server.RequestHandlerClass.requests_served} requests served from the snapshot"
+    else:
+        source = f"{Cassette(cassette).stats()['entries']} responses in the cassette"
+    print(f"\n{len(records)} runs in {wall:.1f}s wall ({total:.1f}s summed run time), {source}")
+    return records
+
+
+def replicates_from_scripts(paths):
+    """One replicate per existing scratch script, keyed by its `<model>_runNN` directory."""
+    replicates = []
+    for path in paths:
+        project_dir = os.path.dirname(os.path.abspath(path))
+        m = re.match(r'(.+)_run(\d+)$', os.path.basename(project_dir))
+        model_key, run_idx = (m.group(1), int(m.group(2))) if m else (os.path.basename(project_dir), 0)
+        replicates.append({'model_key': model_key, 'run_idx': run_idx, 'project_dir': project_dir,
+                           'command': f'{sys.executable} {os.path.basename(path)}'})
+    return replicates
+
+
+def replicates_from_template(command, models, runs, out_dir):
+    replicates = []
+    for model_key in models:
+        for run_idx in range(1, runs + 1):
+            project_dir = os.path.abspath(os.path.join(out_dir, f'{model_key}_run{run_idx:02d}'))
+            replicates.append({'model_key': model_key, 'run_idx': run_idx, 'project_dir': project_dir,
+                               'command': command.format(model_key=model_key, run_idx=run_idx,
+                                                         project_dir=project_dir)})
+    return replicates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--snapshot', help='Snapshot directory (fetched if missing)')
+    parser.add_argument('--cassette', help='Instead of a snapshot, share this record/replay cassette of the live API')
+    parser.add_argument('--replay', action='store_true', help='With --cassette, fail on unrecorded requests')
+    parser.add_argument('--invitation', default='TMLR/-/Submission')
+    parser.add_argument('--results', default='tmlr_experiment/experiment_results.jsonl')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=600, help='Per-run timeout in seconds')
+    parser.add_argument('--scripts', nargs='+', help='Re-run existing scratch scripts as replicates')
+    parser.add_argument('--command', help='Command template with {model_key}, {run_idx}, {project_dir}')
+    parser.add_argument('--models', default='opus-4.5,opus-4.6')
+    parser.add_argument('--runs', type=int, default=25)
+    parser.add_argument('--out-dir', default='tmlr_experiment')
+    parser.add_argument('--fast-fail-rate', type=float, default=0.5,
+                        help='Back off when this share of recent runs fail instantly (0 disables)')
+    parser.add_argument('--fast-fail-window', type=int, default=10)
+    args = parser.parse_args()
+
+    if not (args.snapshot or args.cassette):
+        parser.error('one of --snapshot or --cassette is required')
+    if args.scripts:
+        replicates = replicates_from_scripts(args.scripts)
+    elif args.command:
+        replicates = replicates_from_template(args.command, args.models.split(','), args.runs, args.out_dir)
+    else:
+        parser.error('one of --scripts or --command is required')
+    monitor = None
+    if args.fast_fail_rate > 0:
+        monitor = FastFailMonitor(window=args.fast_fail_window, threshold=args.fast_fail_rate,
+                                  min_runs=min(5, args.fast_fail_window))
+    run_experiment(replicates, args.snapshot, args.results, workers=args.workers,
+                   timeout=args.timeout, invitation=args.invitation, monitor=monitor,
+                   cassette=args.cassette, replay=args.replay)
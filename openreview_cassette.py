@@ -0,0 +1,211 @@
+"""Record/replay cache ("cassette") for OpenReview API calls, shared across scripts.
+
+`install(path)` wraps `requests.Session.send`, so every client built on
+requests (`openreview.api.OpenReviewClient`, the v1 `openreview.Client`,
+`openreview_lean.LeanClient`, plain `requests`) goes through it unchanged. A
+GET to an OpenReview host is keyed by its URL with sorted query parameters:
+a recorded response is answered locally, a new one is sent to the network
+and recorded. Only 2xx and 4xx responses are recorded (429s and 5xx stay
+live), and non-GET requests such as logins always pass through. With
+`replay=True` an unrecorded request raises `CassetteMiss` instead, so a run is
+guaranteed to be network-free and deterministic.
+
+The cassette is one SQLite file (bodies stored decoded and zlib-compressed)
+that any number of processes can record into and replay from at once.
+`run` executes a command with the cassette installed through a
+sitecustomize shim; `experiment_orchestrator.py --cassette` does the same
+for every replicate.
+
+Usage:
+    python openreview_cassette.py run --cassette cassettes/tmlr.sqlite -- python tmlr_experiment/opus-4.5_run01/scratch.py
+    python openreview_cassette.py run --cassette cassettes/tmlr.sqlite --replay -- python scratch.py
+    python openreview_cassette.py stats cassettes/tmlr.sqlite
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+HOSTS = ('openreview.net',)
+
+# Headers that describe the wire encoding; the stored body is already decoded
+_DROP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive',
+                 'set-cookie', 'date'}
+
+
+class CassetteMiss(Exception):
+    """A request that is not in the cassette was made in replay mode."""
+
+
+def request_key(method, url):
+    """'GET https://host/notes?a=1&b=2' with the query parameters sorted."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f'{method} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))}'
+
+
+class Cassette:
+    """SQLite store of recorded responses, with an in-process memo of the ones already read."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._local = threading.local()
+        self._memo = {}
+        self.hits = 0
+        self.misses = 0
+        self._db().execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, status INTEGER, '
+                           'reason TEXT, headers TEXT, body BLOB, recorded_at INTEGER)')
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        """`(status, reason, headers, body)` for a recorded key, or None."""
+        entry = self._memo.get(key)
+        if entry is None:
+            row = self._db().execute('SELECT status, reason, headers, body FROM responses WHERE key = ?',
+                                     (key,)).fetchone()
+            if row is None:
+                return None
+            entry = self._memo[key] = (row[0], row[1], json.loads(row[2]), zlib.decompress(row[3]))
+        return entry
+
+    def put(self, key, status, reason, headers, body):
+        headers = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        self._db().execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                           (key, status, reason, json.dumps(headers), zlib.compress(body, 6),
+                            int(time.time() * 1000)))
+        self._memo[key] = (status, reason, headers, body)
+
+    def stats(self):
+        n, size = self._db().execute('SELECT count(*), coalesce(sum(length(body)), 0) FROM responses').fetchone()
+        return {'entries': n, 'stored_bytes': size}
+
+
+def _response(request, status, reason, headers, body):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.reason = reason
+    resp.headers = CaseInsensitiveDict(headers)
+    resp._content = body
+    # Already read: iter_content/iter_lines (stream=True) slice `_content`, raw readers get a file
+    resp._content_consumed = True
+    resp.raw = io.BytesIO(body)
+    resp.url = request.url
+    resp.request = request
+    resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+    return resp
+
+
+_installed = None
+
+
+def install(path, replay=False, hosts=HOSTS):
+    """Route GETs to `hosts` (substrings of the host name) through the cassette at `path`."""
+    global _installed
+    cassette = Cassette(path)
+    send = _installed[0] if _installed else requests.Session.send
+
+    def cassette_send(session, request, **kwargs):
+        if request.method != 'GET' or not any(h in (urlsplit(request.url).hostname or '') for h in hosts):
+            return send(session, request, **kwargs)
+        key = request_key(request.method, request.url)
+        entry = cassette.get(key)
+        if entry is not None:
+            cassette.hits += 1
+            return _response(request, *entry)
+        if replay:
+            raise CassetteMiss(f'{key} is not in {path}')
+        cassette.misses += 1
+        resp = send(session, request, **kwargs)
+        if resp.status_code < 500 and resp.status_code != 429:
+            cassette.put(key, resp.status_code, resp.reason, dict(resp.headers), resp.content)
+        return resp
+
+    requests.Session.send = cassette_send
+    _installed = (send, cassette)
+    return cassette
+
+
+def uninstall():
+    global _installed
+    if _installed:
+        requests.Session.send = _installed[0]
+        _installed = None
+
+
+def install_from_env():
+    """Install from OPENREVIEW_CASSETTE (path) and OPENREVIEW_CASSETTE_MODE (`record`/`replay`), if set."""
+    path = os.environ.get('OPENREVIEW_CASSETTE')
+    if path:
+        return install(path, replay=os.environ.get('OPENREVIEW_CASSETTE_MODE') == 'replay')
+    return None
+
+
+_SHIM = '''\
+import openreview_cassette
+
+openreview_cassette.install_from_env()
+'''
+
+
+def write_shim(shim_dir=None, extra=''):
+    """A directory with this module and a sitecustomize.py that installs it from the environment."""
+    shim_dir = shim_dir or tempfile.mkdtemp(prefix='openreview_shim_')
+    shutil.copy(os.path.abspath(__file__), os.path.join(shim_dir, 'openreview_cassette.py'))
+    with open(os.path.join(shim_dir, 'sitecustomize.py'), 'w') as f:
+        f.write(_SHIM + extra)
+    return shim_dir
+
+
+def cassette_env(path, replay=False, env=None):
+    """Environment for a child process that should use the cassette at `path`."""
+    env = dict(os.environ if env is None else env)
+    env['OPENREVIEW_CASSETTE'] = os.path.abspath(path)
+    env['OPENREVIEW_CASSETTE_MODE'] = 'replay' if replay else 'record'
+    return env
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_run = sub.add_parser('run', help='Run a command with the cassette installed')
+    p_run.add_argument('--cassette', required=True, help='SQLite cassette file (created if missing)')
+    p_run.add_argument('--replay', action='store_true', help='Fail on unrecorded requests instead of fetching')
+    p_run.add_argument('cmd', nargs=argparse.REMAINDER, help='Command to run (after --)')
+    p_stats = sub.add_parser('stats', help='Print the number of recorded responses')
+    p_stats.add_argument('cassette')
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        stats = Cassette(args.cassette).stats()
+        print(f"{args.cassette}: {stats['entries']} responses, {stats['stored_bytes'] / 2**20:.1f} MiB stored")
+    else:
+        cmd = args.cmd[1:] if args.cmd[:1] == ['--'] else args.cmd
+        if not cmd:
+            parser.error('no command given')
+        shim_dir = write_shim()
+        env = cassette_env(args.cassette, args.replay)
+        env['PYTHONPATH'] = os.pathsep.join(p for p in [shim_dir, env.get('PYTHONPATH')] if p)
+        try:
+            sys.exit(subprocess.run(cmd, env=env).returncode)
+        finally:
+            shutil.rmtree(shim_dir, ignore_errors=True)
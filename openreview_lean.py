@@ -0,0 +1,221 @@
+"""Lean read path for the `/notes` endpoint: raw JSON straight into small structs.
+
+`openreview.api.OpenReviewClient.get_all_notes` builds a full `Note` object
+(and one per reply) for every record, although the audit only reads a few
+fields of each. `LeanClient` calls the same endpoint with the same paging
+(`sort=id`, `after=<last id>`) over one pooled keep-alive session that accepts
+gzip, and decodes each page with msgspec directly into `LeanNote` /
+`LeanReply` structs: every other field (titles, abstracts, review bodies) is
+skipped by the decoder without being materialized.
+
+The structs keep what the audit, timeline and workload code read: id, forum,
+number, invitations, cdate, odate (review release), signatures and the
+decision text (the venue's `decision_field`). `note_to_dict` turns them into raw API dicts, so
+they can be passed anywhere notes are accepted, including `fetch_snapshot`
+(which then writes a snapshot with only these fields).
+
+Usage:
+    python openreview_lean.py --venue TMLR --project --compare
+    python openreview_lean.py --snapshot snapshots/TMLR --project --compare
+"""
+import argparse
+import functools
+import time
+import tracemalloc
+from typing import Any, Optional, Union
+
+import msgspec
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from openreview_snapshot import OPENREVIEW_BASEURL
+
+
+class _Value(msgspec.Struct, omit_defaults=True):
+    value: Any = None
+
+
+class LeanReply(msgspec.Struct, omit_defaults=True):
+    id: str
+    forum: Optional[str] = None
+    invitations: list[str] = []
+    cdate: Optional[int] = None
+    odate: Optional[int] = None
+    signatures: list[str] = []
+    # `content`, holding only the venue's decision field, is added by `_structs`
+
+    @property
+    def recommendation(self):
+        """The decision text, from whichever content field the venue uses."""
+        content = getattr(self, 'content', None)
+        if content is None:
+            return None
+        rec = getattr(content, type(content).__struct_fields__[0])
+        return rec.value if isinstance(rec, _Value) else rec
+
+
+class LeanNote(msgspec.Struct, omit_defaults=True):
+    id: str
+    forum: Optional[str] = None
+    number: Optional[int] = None
+    invitations: list[str] = []
+    cdate: Optional[int] = None
+    signatures: list[str] = []
+    # `details` (the replies) is added by `_structs`
+
+    @property
+    def replies(self):
+        details = getattr(self, 'details', None)
+        return details.replies if details else []
+
+    def to_dict(self):
+        """Raw API dict with only the lean fields (unset ones omitted)."""
+        return msgspec.to_builtins(self, builtin_types=None)
+
+
+@functools.lru_cache(maxsize=None)
+def _structs(decision_field='recommendation'):
+    """`(page decoder, reply page decoder, details type)` for replies keeping `content.<decision_field>`.
+
+    ICLR and NeurIPS keep the decision text in `content.decision`, TMLR in
+    `content.recommendation` (`VenueConfig.decision_field`).
+    """
+    def struct(name, fields, bases=()):
+        return msgspec.defstruct(name, fields, bases=bases, module=__name__, omit_defaults=True)
+
+    content = struct('_Content', [(decision_field, Union[str, _Value, None], None)])
+    reply = struct('LeanReply', [('content', Optional[content], None)], (LeanReply,))
+    details = struct('_Details', [('replies', list[reply], [])])
+    note = struct('LeanNote', [('details', Optional[details], None)], (LeanNote,))
+    page = struct('_Page', [('notes', list[note]), ('count', Optional[int], None)])
+    reply_page = struct('_ReplyPage', [('notes', list[reply]), ('count', Optional[int], None)])
+    return msgspec.json.Decoder(page).decode, msgspec.json.Decoder(reply_page).decode, details
+
+
+# Fields requested with `select` by get_projected_notes (replies also select `content.<decision_field>`)
+SUBMISSION_FIELDS = ('id', 'forum', 'number', 'invitations', 'cdate', 'signatures')
+REPLY_FIELDS = ('id', 'forum', 'invitations', 'cdate', 'odate', 'signatures')
+
+
+class LeanClient:
+    """Read-only `/notes` client returning `LeanNote`s instead of `Note`s.
+
+    Replies keep only the `decision_field` of their content (the venue's
+    `VenueConfig.decision_field`).
+    """
+
+    def __init__(self, baseurl=OPENREVIEW_BASEURL, page_size=1000, pool_size=8, decision_field='recommendation'):
+        self.baseurl = baseurl.rstrip('/')
+        self.decision_field = decision_field
+        self.page_size = page_size
+        self.session = requests.Session()
+        retry = Retry(total=8, connect=1, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False, respect_retry_after_header=True)
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip'})
+        self.bytes_received = 0
+
+    def get_notes(self, _decode=None, **params):
+        """One page of `/notes` as `(notes, count)`; `params` are passed as query parameters."""
+        _decode = _decode or _structs(self.decision_field)[0]
+        resp = self.session.get(f'{self.baseurl}/notes', params={k: v for k, v in params.items() if v is not None})
+        resp.raise_for_status()
+        self.bytes_received += int(resp.headers.get('Content-Length') or len(resp.content))
+        page = _decode(resp.content)
+        return page.notes, page.count
+
+    def _get_all(self, decode, **params):
+        params.update(sort='id', limit=self.page_size)
+        notes, after = [], None
+        while True:
+            page, _ = self.get_notes(decode, **params, after=after)
+            notes.extend(page)
+            if len(page) < self.page_size:
+                return notes
+            after = page[-1].id
+
+    def get_all_notes(self, id=None, forum=None, invitation=None, parent_invitations=None, replyto=None,
+                      signature=None, number=None, details=None, select=None):
+        """Every matching note, paged by id like `OpenReviewClient.get_all_notes`.
+
+        `select` (field names, 'content.x' for one content field) asks the
+        server to return only those fields.
+        """
+        return self._get_all(_structs(self.decision_field)[0], id=id, forum=forum, invitation=invitation,
+                             parentInvitations=parent_invitations, replyto=replyto, signature=signature,
+                             number=number, details=details, select=','.join(select) if select else None)
+
+    def get_projected_notes(self, invitation, reply_invitations):
+        """Submissions of `invitation` with only the replies posted under `reply_invitations`.
+
+        Instead of `details=replies`, which returns every reply in full, the
+        submissions are fetched bare and the replies with one bulk query per
+        venue-level invitation (e.g. 'TMLR/-/Review'), each selecting only
+        SUBMISSION_FIELDS / REPLY_FIELDS and the decision field. A server that ignores `select` still
+        works; the decoder drops the extra fields.
+        """
+        _, decode_replies, details = _structs(self.decision_field)
+        select = ','.join(REPLY_FIELDS + (f'content.{self.decision_field}',))
+        notes = self.get_all_notes(invitation=invitation, select=SUBMISSION_FIELDS)
+        by_forum = {}
+        seen = set()
+        for parent in reply_invitations:
+            for reply in self._get_all(decode_replies, parentInvitations=parent, select=select):
+                if reply.id not in seen:
+                    seen.add(reply.id)
+                    by_forum.setdefault(reply.forum, []).append(reply)
+        for note in notes:
+            note.details = details(replies=by_forum.get(note.id, []))
+        return notes
+
+
+def _measure(fetch):
+    """`(result, CPU seconds of this thread, peak traced MiB)` of one fetch."""
+    tracemalloc.start()
+    start = time.thread_time()
+    result = fetch()
+    cpu = time.thread_time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, cpu, peak / 2**20
+
+
+if __name__ == '__main__':
+    from audit_engine import VENUES
+    from openreview_snapshot import serve_snapshot
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--venue', default='TMLR', choices=sorted(VENUES))
+    parser.add_argument('--baseurl', default=OPENREVIEW_BASEURL)
+    parser.add_argument('--snapshot', help='Serve this snapshot directory locally and report the bytes it served')
+    parser.add_argument('--project', action='store_true', help='Also fetch with field projection')
+    parser.add_argument('--compare', action='store_true', help='Also fetch with OpenReviewClient')
+    args = parser.parse_args()
+
+    venue = VENUES[args.venue]
+    handler = None
+    if args.snapshot:
+        server, args.baseurl = serve_snapshot(args.snapshot)
+        handler = server.RequestHandlerClass
+
+    def run(label, fetch):
+        served = (handler.bytes_served, handler.payload_bytes) if handler else None
+        notes, cpu, peak = _measure(fetch)
+        line = f"{label:<18} {len(notes):>6} notes {cpu:>6.2f}s CPU {peak:>7.1f} MiB peak"
+        if handler:
+            wire, payload = handler.bytes_served - served[0], handler.payload_bytes - served[1]
+            line += f" {wire / 2**20:>7.2f} MiB served ({payload / 2**20:.2f} MiB JSON)"
+        print(line)
+
+    client = LeanClient(args.baseurl, decision_field=venue.decision_field)
+    run('LeanClient', lambda: client.get_all_notes(invitation=venue.submission, details='replies'))
+    if args.project:
+        run('LeanClient, select', lambda: client.get_projected_notes(venue.submission, venue.reply_invitations()))
+    if args.compare:
+        import openreview
+
+        full = openreview.api.OpenReviewClient(baseurl=args.baseurl)
+        run('OpenReviewClient', lambda: full.get_all_notes(invitation=venue.submission, details='replies'))
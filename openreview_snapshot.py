@@ -0,0 +1,339 @@
+"""Local, read-only snapshot of OpenReview notes served through the client API.
+
+`fetch_snapshot` pulls the venue's submissions (with replies) once and writes
+them to `<dir>/notes.jsonl.gz`. A `Snapshot` indexes every submission and reply
+by id, forum, replyto and invitation; it can be queried in-process through
+`SnapshotClient` (same method names and keyword arguments as
+`openreview.api.OpenReviewClient`) or over HTTP through `serve_snapshot`, which
+answers the `/notes` and `/invitations` endpoints so an unmodified
+`OpenReviewClient(baseurl=...)` can talk to it.
+
+Usage:
+    python openreview_snapshot.py fetch snapshots/tmlr
+    python openreview_snapshot.py serve snapshots/tmlr --port 3001
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+OPENREVIEW_BASEURL = 'https://api2.openreview.net'
+
+# Note attributes kept in the snapshot (Note.to_json drops several of these)
+_NOTE_FIELDS = [
+    ('id', 'id'), ('number', 'number'), ('forum', 'forum'), ('replyto', 'replyto'),
+    ('invitations', 'invitations'), ('parent_invitations', 'parentInvitations'),
+    ('cdate', 'cdate'), ('tcdate', 'tcdate'), ('tmdate', 'tmdate'), ('mdate', 'mdate'),
+    ('odate', 'odate'), ('pdate', 'pdate'), ('ddate', 'ddate'), ('domain', 'domain'),
+    ('signatures', 'signatures'), ('readers', 'readers'), ('writers', 'writers'),
+    ('content', 'content'), ('details', 'details'),
+]
+
+
+def parent_invitation(invitation):
+    """Venue-level invitation a per-paper one is created from: 'TMLR/Paper12/-/Review' -> 'TMLR/-/Review'."""
+    return re.sub(r'/(Paper|Submission)\d+/-/', '/-/', invitation)
+
+
+def project_note(note, select):
+    """Keep only the `select`ed fields of a raw note; 'content.x' keeps one content field."""
+    out = {}
+    for field in select:
+        head, _, rest = field.partition('.')
+        if head not in note:
+            continue
+        if rest:
+            if isinstance(note[head], dict) and rest in note[head]:
+                out.setdefault(head, {})[rest] = note[head][rest]
+        else:
+            out[head] = note[head]
+    return out
+
+
+def note_to_dict(note):
+    """Raw API dict for an `openreview.api.Note` or a lean note (or pass a dict through)."""
+    if isinstance(note, dict):
+        return note
+    if hasattr(note, 'to_dict'):
+        return note.to_dict()
+    out = {}
+    for attr, key in _NOTE_FIELDS:
+        value = getattr(note, attr, None)
+        if value is not None:
+            out[key] = value
+    return out
+
+
+def fetch_snapshot(path, invitation='TMLR/-/Submission', client=None, reply_invitations=None):
+    """Fetch all notes for `invitation` with replies and write them to `path`.
+
+    With `reply_invitations` (needs an `openreview_lean.LeanClient`), only the
+    replies under those venue-level invitations are fetched, with projected fields.
+    """
+    if client is None:
+        import openreview
+        client = openreview.api.OpenReviewClient(baseurl=OPENREVIEW_BASEURL)
+    fetched_at = int(time.time() * 1000)
+    if reply_invitations:
+        notes = client.get_projected_notes(invitation, reply_invitations)
+    else:
+        notes = client.get_all_notes(invitation=invitation, details='replies')
+    write_snapshot(path, [note_to_dict(n) for n in notes], invitation=invitation, fetched_at=fetched_at)
+    return len(notes)
+
+
+def write_snapshot(path, notes, invitation, fetched_at):
+    os.makedirs(path, exist_ok=True)
+    tmp = os.path.join(path, 'notes.jsonl.gz.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        for note in notes:
+            f.write(json.dumps(note, separators=(',', ':')))
+            f.write('\n')
+    os.replace(tmp, os.path.join(path, 'notes.jsonl.gz'))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'invitation': invitation, 'fetched_at': fetched_at, 'n_notes': len(notes)}, f, indent=2)
+
+
+def read_snapshot(path):
+    """Load the raw submission dicts (with `details.replies`) from a snapshot."""
+    with gzip.open(os.path.join(path, 'notes.jsonl.gz'), 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def snapshot_meta(path):
+    with open(os.path.join(path, 'meta.json')) as f:
+        return json.load(f)
+
+
+class Snapshot:
+    """In-memory index over the notes of a snapshot directory (read-only)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = snapshot_meta(path)
+        self.submissions = read_snapshot(path)
+        self.notes = {}
+        self.replies = {}
+        self.by_forum = {}
+        self.by_replyto = {}
+        self.by_invitation = {}
+        self.by_parent = {}
+        for sub in self.submissions:
+            replies = (sub.get('details') or {}).get('replies', [])
+            self.replies[sub['id']] = replies
+            for note in [sub] + replies:
+                self.notes[note['id']] = note
+                self.by_forum.setdefault(note.get('forum', sub['id']), []).append(note['id'])
+                if note.get('replyto'):
+                    self.by_replyto.setdefault(note['replyto'], []).append(note['id'])
+                for inv in note.get('invitations', []):
+                    self.by_invitation.setdefault(inv, []).append(note['id'])
+                for parent in {parent_invitation(inv) for inv in note.get('invitations', [])}:
+                    self.by_parent.setdefault(parent, []).append(note['id'])
+        self.invitations = sorted(self.by_invitation)
+
+    def query_notes(self, id=None, forum=None, invitation=None, replyto=None, number=None,
+                    signature=None, details=None, sort='id', after=None, offset=None, limit=1000,
+                    parent_invitations=None, select=None):
+        """Filter notes the way the `/notes` endpoint does (exact matches only).
+
+        Returns `(page, count)` where `count` is the number of matches before
+        paging; raises ValueError, as the API answers 400, when no filter is
+        given. Submissions keep their replies only when `details` asks for them;
+        `select` (a comma-separated field list) trims every returned note.
+        """
+        if id is not None:
+            ids = [id] if id in self.notes else []
+        elif parent_invitations is not None:
+            ids = self.by_parent.get(parent_invitations, [])
+        elif forum is not None:
+            ids = self.by_forum.get(forum, [])
+        elif invitation is not None:
+            ids = self.by_invitation.get(invitation, [])
+        elif replyto is not None:
+            ids = self.by_replyto.get(replyto, [])
+        elif signature is not None:
+            ids = list(self.notes)
+        else:
+            # The live API refuses to list every note
+            raise ValueError('Missing required parameter: one of id, forum, invitation, replyto, '
+                             'parentInvitations or signature')
+        notes = [self.notes[i] for i in ids]
+        if invitation is not None:
+            notes = [n for n in notes if invitation in n.get('invitations', [])]
+        if replyto is not None:
+            notes = [n for n in notes if n.get('replyto') == replyto]
+        if number is not None:
+            notes = [n for n in notes if n.get('number') == int(number)]
+        if signature is not None:
+            notes = [n for n in notes if signature in n.get('signatures', [])]
+        key = (sort or 'id').split(':')[0]
+        notes.sort(key=lambda n: (n.get(key) is None, n.get(key) or 0) if key != 'id' else n['id'])
+        count = len(notes)
+        if after is not None:
+            notes = [n for n in notes if n['id'] > after]
+        if offset:
+            notes = notes[int(offset):]
+        notes = notes[:int(limit or 1000)]
+        if not (details and 'replies' in details):
+            notes = [{k: v for k, v in n.items() if k != 'details'} for n in notes]
+        if select:
+            notes = [project_note(n, select.split(',')) for n in notes]
+        return notes, count
+
+    def query_invitations(self, id=None, prefix=None, offset=None, limit=1000):
+        ids = self.invitations
+        if id is not None:
+            ids = [i for i in ids if i == id]
+        if prefix is not None:
+            ids = [i for i in ids if i.startswith(prefix)]
+        count = len(ids)
+        ids = ids[int(offset or 0):int(offset or 0) + int(limit or 1000)]
+        return [{'id': i, 'domain': i.split('/')[0]} for i in ids], count
+
+
+class SnapshotClient:
+    """Drop-in stand-in for the read side of `openreview.api.OpenReviewClient`.
+
+    Only the keyword arguments the real client accepts are accepted here, so
+    scripts fail against the snapshot exactly where they would fail live.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot if isinstance(snapshot, Snapshot) else Snapshot(snapshot)
+
+    def _query_notes(self, **params):
+        import openreview
+        try:
+            return self.snapshot.query_notes(**params)
+        except ValueError as e:
+            raise openreview.OpenReviewException({'name': 'ValidationError', 'message': str(e), 'status': 400})
+
+    def get_note(self, id, details=None):
+        import openreview
+        notes, _ = self._query_notes(id=id, details=details)
+        if not notes:
+            raise openreview.OpenReviewException({'name': 'NotFoundError', 'message': f'The Note {id} was not found'})
+        return openreview.api.Note.from_json(notes[0])
+
+    def get_notes(self, id=None, forum=None, invitation=None, parent_invitations=None, replyto=None,
+                  signature=None, number=None, limit=None, offset=None, after=None, details=None, sort=None,
+                  with_count=None):
+        import openreview
+        notes, count = self._query_notes(id=id, forum=forum, invitation=invitation, replyto=replyto,
+                                         number=number, signature=signature, details=details,
+                                         sort=sort, after=after, offset=offset, limit=limit,
+                                         parent_invitations=parent_invitations)
+        notes = [openreview.api.Note.from_json(n) for n in notes]
+        if with_count and offset is None:
+            return notes, count
+        return notes
+
+    def get_all_notes(self, id=None, forum=None, invitation=None, parent_invitations=None, replyto=None,
+                      signature=None, number=None, details=None, sort=None):
+        import openreview
+        notes, _ = self._query_notes(id=id, forum=forum, invitation=invitation, replyto=replyto,
+                                     number=number, signature=signature, details=details,
+                                     sort=sort, limit=len(self.snapshot.notes),
+                                     parent_invitations=parent_invitations)
+        return [openreview.api.Note.from_json(n) for n in notes]
+
+    def get_invitations(self, id=None, prefix=None, limit=None, offset=None):
+        import openreview
+        invs, _ = self.snapshot.query_invitations(id=id, prefix=prefix, offset=offset, limit=limit)
+        return [openreview.api.Invitation.from_json(i) for i in invs]
+
+    def get_all_invitations(self, id=None, prefix=None):
+        return self.get_invitations(id=id, prefix=prefix, limit=len(self.snapshot.invitations) or 1)
+
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    snapshot = None
+    bytes_served = 0      # on the wire (after gzip)
+    payload_bytes = 0     # uncompressed JSON
+    requests_served = 0
+    _lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        size = len(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self._lock:
+            type(self).bytes_served += len(body)
+            type(self).payload_bytes += size
+            type(self).requests_served += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == '/notes':
+                notes, count = self.snapshot.query_notes(
+                    id=params.get('id'), forum=params.get('forum'), invitation=params.get('invitation'),
+                    replyto=params.get('replyto'), number=params.get('number'),
+                    signature=params.get('signature'), details=params.get('details'),
+                    sort=params.get('sort'), after=params.get('after'), offset=params.get('offset'),
+                    limit=params.get('limit', 1000), parent_invitations=params.get('parentInvitations'),
+                    select=params.get('select'))
+                self._send_json(200, {'notes': notes, 'count': count})
+            elif url.path == '/invitations':
+                invs, count = self.snapshot.query_invitations(
+                    id=params.get('id'), prefix=params.get('prefix'),
+                    offset=params.get('offset'), limit=params.get('limit', 1000))
+                self._send_json(200, {'invitations': invs, 'count': count})
+            else:
+                self._send_json(404, {'name': 'NotFoundError', 'message': f'{url.path} is not served by the snapshot'})
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {'name': 'ValidationError', 'message': str(e), 'status': 400})
+
+
+def serve_snapshot(snapshot, host='127.0.0.1', port=0):
+    """Start a threaded HTTP stand-in for the API; returns `(server, baseurl)`.
+
+    The server runs in a daemon thread; call `server.shutdown()` to stop it.
+    """
+    snapshot = snapshot if isinstance(snapshot, Snapshot) else Snapshot(snapshot)
+    handler = type('SnapshotHandler', (_SnapshotHandler,), {'snapshot': snapshot})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_fetch = sub.add_parser('fetch', help='Fetch submissions with replies into a snapshot directory')
+    p_fetch.add_argument('path')
+    p_fetch.add_argument('--invitation', default='TMLR/-/Submission')
+    p_serve = sub.add_parser('serve', help='Serve a snapshot over the /notes and /invitations endpoints')
+    p_serve.add_argument('path')
+    p_serve.add_argument('--host', default='127.0.0.1')
+    p_serve.add_argument('--port', type=int, default=3001)
+    args = parser.parse_args()
+
+    if args.command == 'fetch':
+        n = fetch_snapshot(args.path, invitation=args.invitation)
+        print(f"Saved {n} notes to {args.path}")
+    else:
+        server, url = serve_snapshot(args.path, host=args.host, port=args.port)
+        print(f"Serving {args.path} at {url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
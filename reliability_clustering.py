@@ -0,0 +1,163 @@
+"""Automatic agent clustering for the replication reliability analysis.
+
+Replaces the hand-picked forks (Q06 baseline, Q08 prose/code) in the
+interpretation section with hierarchical clustering over the response matrix R.
+Agents are bit-packed, pairwise Hamming distances and TVD-MI are computed into
+condensed arrays (scipy `pdist` order), and every split of the dendrogram is
+reported with the queries that separate it and its within/between TVD-MI.
+
+Usage:
+    python reliability_clustering.py tmlr_audit_reliability/opus-4.6_run01/_data.pkl
+    python reliability_clustering.py STORE        # artifact store from reliability_store.py
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+from scipy.cluster.hierarchy import linkage, to_tree
+
+# Number of set bits for every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int32)
+
+
+def pack_responses(R):
+    """Pack a Q x N response matrix into one bit row per agent, shape (N, ceil(Q/8))."""
+    bits = np.asarray(R, dtype=bool).T
+    return np.packbits(bits, axis=1), bits.shape[1]
+
+
+def condensed_distances(packed, Q):
+    """Return condensed (Hamming fraction, TVD-MI) arrays for all agent pairs.
+
+    For binary responses the four cells of |P(x,y) - P_i(x) P_j(y)| share the
+    same magnitude, so TVD-MI reduces to 2 |P(1,1) - p_i p_j|. Each row of the
+    condensed arrays is filled with one vectorized popcount against all later
+    agents.
+    """
+    n = packed.shape[0]
+    ones = _POPCOUNT[packed].sum(axis=1)
+    hamming = np.empty(n * (n - 1) // 2, dtype=np.float64)
+    tvd = np.empty_like(hamming)
+    start = 0
+    for i in range(n - 1):
+        rest = packed[i + 1:]
+        stop = start + len(rest)
+        hamming[start:stop] = _POPCOUNT[rest ^ packed[i]].sum(axis=1)
+        n11 = _POPCOUNT[rest & packed[i]].sum(axis=1)
+        tvd[start:stop] = 2 * np.abs(n11 / Q - (ones[i] / Q) * (ones[i + 1:] / Q))
+        start = stop
+    return hamming / Q, tvd
+
+
+def condensed_index(n, i, j):
+    """Vectorized position of pair (i, j), i != j, in a condensed array of n items."""
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+
+def within_values(condensed, n, members):
+    """Condensed values for all pairs inside one group."""
+    members = np.asarray(members)
+    a, b = np.triu_indices(len(members), k=1)
+    return condensed[condensed_index(n, members[a], members[b])]
+
+
+def between_values(condensed, n, left, right):
+    """Condensed values for all pairs with one agent in each group."""
+    a, b = np.meshgrid(np.asarray(left), np.asarray(right), indexing='ij')
+    return condensed[condensed_index(n, a.ravel(), b.ravel())]
+
+
+def separating_queries(bits, left, right, top=3):
+    """Rank queries by the gap in yes-rate between two groups of agents."""
+    rate_l = bits[left].mean(axis=0)
+    rate_r = bits[right].mean(axis=0)
+    gap = np.abs(rate_l - rate_r)
+    order = np.argsort(-gap, kind='stable')[:top]
+    return [(int(q), rate_l[q], rate_r[q]) for q in order if gap[q] > 0]
+
+
+def cluster_agents(R, method='average', max_splits=4, top_queries=3):
+    """Cluster agents on Hamming distance and describe the top dendrogram splits.
+
+    Returns a dict with the condensed distance arrays, the linkage matrix and a
+    list of splits (largest first). Each split holds the two member index
+    arrays, the separating queries and the within/between TVD-MI means.
+    """
+    packed, Q = pack_responses(R)
+    bits = np.unpackbits(packed, axis=1, count=Q).astype(bool)
+    n = bits.shape[0]
+    hamming, tvd = condensed_distances(packed, Q)
+    Z = linkage(hamming, method=method)
+
+    splits = []
+    frontier = [to_tree(Z)]
+    while frontier and len(splits) < max_splits:
+        node = max(frontier, key=lambda x: (x.dist, x.count))
+        frontier.remove(node)
+        if node.is_leaf() or node.dist == 0:
+            continue
+        left = np.sort(node.get_left().pre_order())
+        right = np.sort(node.get_right().pre_order())
+        w_left = within_values(tvd, n, left)
+        w_right = within_values(tvd, n, right)
+        between = between_values(tvd, n, left, right)
+        splits.append({
+            'height': node.dist,
+            'left': left,
+            'right': right,
+            'queries': separating_queries(bits, left, right, top=top_queries),
+            'within_left': w_left.mean() if len(w_left) else float('nan'),
+            'within_right': w_right.mean() if len(w_right) else float('nan'),
+            'between': between.mean(),
+            'n_within_left': len(w_left),
+            'n_within_right': len(w_right),
+            'n_between': len(between),
+        })
+        frontier.extend([node.get_left(), node.get_right()])
+
+    return {'hamming': hamming, 'tvd': tvd, 'linkage': Z, 'splits': splits, 'bits': bits}
+
+
+def print_clusters(result, aids, QN):
+    """Print the clustering report in the same layout as the reliability scratch output."""
+    bits = result['bits']
+    profiles, counts = np.unique(bits, axis=0, return_counts=True)
+    print("## 8. Interpretation (automatic clustering)\n")
+    print(f"  Distinct response profiles: {len(profiles)} ({(counts > 1).sum()} shared by >1 agent)")
+
+    for k, split in enumerate(result['splits'], 1):
+        left, right = split['left'], split['right']
+        print(f"\n  --- Split {k}: {len(left)} vs {len(right)} agents "
+              f"(Hamming height {split['height']:.3f}) ---")
+        for q, rl, rr in split['queries']:
+            print(f"    {QN[q]:<20s} yes-rate {rl:.2f} vs {rr:.2f}")
+        if len(right) <= len(left):
+            print(f"    Minority side: {', '.join(aids[i] for i in right)}")
+        else:
+            print(f"    Minority side: {', '.join(aids[i] for i in left)}")
+        for label, key in [('Within side A', 'left'), ('Within side B', 'right')]:
+            if split[f'n_within_{key}']:
+                print(f"    {label}: mean TVD-MI = {split[f'within_{key}']:.4f} ({split[f'n_within_{key}']} pairs)")
+            else:
+                print(f"    {label}: single agent")
+        print(f"    Between sides: mean TVD-MI = {split['between']:.4f} ({split['n_between']} pairs)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', help='Pickle or artifact store with R, aids and QN from the reliability run')
+    parser.add_argument('--method', default='average', help='scipy linkage method')
+    parser.add_argument('--splits', type=int, default=4, help='Number of dendrogram splits to report')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.data):
+        from reliability_store import ArtifactStore
+        store = ArtifactStore(args.data)
+        D = {name: store.get(name) for name in ('R', 'aids', 'QN')}
+    else:
+        with open(args.data, 'rb') as f:
+            D = pickle.load(f)
+    result = cluster_agents(D['R'], method=args.method, max_splits=args.splits)
+    print_clusters(result, D['aids'], D['QN'])
@@ -0,0 +1,284 @@
+"""Typed, versioned artifact store for the replication reliability analysis.
+
+Replaces the single `_data.pkl` handoff. Each artifact is written in its own
+compact format and recorded in `manifest.json` with its content hash:
+
+    traces      columnar Parquet table (status 'SUCCESS' or 'FAILURE')
+    R           bit-packed response matrix (Q x N)
+    TVD         condensed float32 pairwise TVD-MI (scipy pdist order)
+    W_i         float64 array
+    aids, QN,   small JSON values
+    W_all
+
+Stages (extract, query, matrix, tvd, report) record the hash of their inputs
+and rerun only when those change, so a report step loads just the arrays it
+needs instead of unpickling everything.
+
+Usage:
+    python reliability_store.py import tmlr_audit_reliability/opus-4.6_run01/_data.pkl STORE
+    python reliability_store.py run STORE
+    python reliability_store.py info STORE
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from reliability_clustering import cluster_agents, condensed_distances, pack_responses, print_clusters
+
+SCHEMA_VERSION = 1
+
+ARTIFACT_KINDS = {
+    'traces': 'table',
+    'R': 'bits',
+    'aids': 'json',
+    'QN': 'json',
+    'TVD': 'condensed',
+    'W_i': 'array',
+    'W_all': 'json',
+    'report': 'text',
+}
+
+TRACE_COLUMNS = ['filename', 'name', 'message', 'status', 'failure_mode', 'agent_id']
+
+_EXTENSIONS = {'table': '.parquet', 'bits': '.npy', 'condensed': '.npy', 'array': '.npy',
+               'json': '.json', 'text': '.txt'}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _encode(kind, value):
+    """Serialize an artifact value to bytes plus any metadata needed to decode it."""
+    buf = io.BytesIO()
+    meta = {}
+    if kind == 'table':
+        table = pa.Table.from_pylist([{c: row.get(c) for c in TRACE_COLUMNS} for row in value],
+                                     schema=pa.schema([(c, pa.string()) for c in TRACE_COLUMNS]))
+        pq.write_table(table, buf, compression='zstd')
+    elif kind == 'bits':
+        bits = np.asarray(value, dtype=bool)
+        meta['shape'] = list(bits.shape)
+        np.save(buf, np.packbits(bits, axis=None), allow_pickle=False)
+    elif kind == 'condensed':
+        square = np.asarray(value, dtype=np.float64)
+        if square.ndim == 2:
+            i, j = np.triu_indices(len(square), k=1)
+            square = square[i, j]
+        np.save(buf, square.astype(np.float32), allow_pickle=False)
+    elif kind == 'array':
+        np.save(buf, np.asarray(value), allow_pickle=False)
+    elif kind == 'json':
+        buf.write(json.dumps(value).encode())
+    elif kind == 'text':
+        buf.write(value.encode())
+    else:
+        raise ValueError(f"Unknown artifact kind: {kind}")
+    return buf.getvalue(), meta
+
+
+class ArtifactStore:
+    """Directory of typed artifacts plus a manifest of hashes and stage inputs."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('schema_version') != SCHEMA_VERSION:
+                raise ValueError(f"{root}: schema version {self.manifest.get('schema_version')}, "
+                                 f"expected {SCHEMA_VERSION}")
+        else:
+            self.manifest = {'schema_version': SCHEMA_VERSION, 'artifacts': {}, 'stages': {}}
+
+    def _save_manifest(self):
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def _path(self, name):
+        return os.path.join(self.root, name + _EXTENSIONS[ARTIFACT_KINDS[name]])
+
+    def __contains__(self, name):
+        return name in self.manifest['artifacts'] and os.path.exists(self._path(name))
+
+    def hash(self, name):
+        return self.manifest['artifacts'][name]['sha256']
+
+    def put(self, name, value):
+        """Write one artifact; the file is left untouched if its content is unchanged."""
+        kind = ARTIFACT_KINDS[name]
+        data, meta = _encode(kind, value)
+        digest = content_hash(data)
+        if name not in self or self.hash(name) != digest:
+            with open(self._path(name), 'wb') as f:
+                f.write(data)
+        self.manifest['artifacts'][name] = {'kind': kind, 'sha256': digest, 'bytes': len(data), **meta}
+        self._save_manifest()
+        return digest
+
+    def get(self, name, mmap=False):
+        """Load one artifact in its natural in-memory form.
+
+        R comes back as a (Q, N) bool array and TVD as its condensed float32
+        vector; use `square()` for the N x N view.
+        """
+        if name not in self:
+            raise KeyError(f"{name} not in store {self.root}")
+        entry = self.manifest['artifacts'][name]
+        path = self._path(name)
+        kind = entry['kind']
+        if kind == 'table':
+            return pq.read_table(path).to_pylist()
+        if kind == 'bits':
+            shape = entry['shape']
+            return np.unpackbits(np.load(path), count=shape[0] * shape[1]).reshape(shape).astype(bool)
+        if kind in ('condensed', 'array'):
+            return np.load(path, mmap_mode='r' if mmap else None)
+        with open(path) as f:
+            return json.load(f) if kind == 'json' else f.read()
+
+    def traces(self, columns=None, status=None):
+        """Read the trace table, optionally projecting columns and filtering on status.
+
+        `status` is matched case-insensitively: 'success' selects the
+        'SUCCESS' rows (the pickle's `successes`), 'failure' the 'FAILURE' rows.
+        """
+        filters = [('status', '=', status.upper())] if status else None
+        return pq.read_table(self._path('traces'), columns=columns, filters=filters).to_pylist()
+
+    def square(self, name='TVD'):
+        condensed = self.get(name)
+        n = int(round((1 + np.sqrt(1 + 8 * len(condensed))) / 2))
+        M = np.zeros((n, n), dtype=np.float64)
+        i, j = np.triu_indices(n, k=1)
+        M[i, j] = condensed
+        M[j, i] = condensed
+        return M
+
+    def input_hash(self, stage, inputs, params=None):
+        h = hashlib.sha256()
+        h.update(json.dumps([SCHEMA_VERSION, stage, params], sort_keys=True, default=str).encode())
+        for name in inputs:
+            h.update(name.encode())
+            h.update(self.hash(name).encode())
+        return h.hexdigest()
+
+    def run_stage(self, stage, inputs, outputs, fn, params=None):
+        """Run `fn(*inputs)` -> dict of outputs unless the stage is already up to date.
+
+        Returns True if the stage ran, False if it was skipped.
+        """
+        key = self.input_hash(stage, inputs, params)
+        entry = self.manifest['stages'].get(stage)
+        if entry and entry['input_hash'] == key and all(o in self for o in outputs):
+            return False
+        results = fn(*[self.get(name) for name in inputs])
+        for name in outputs:
+            self.put(name, results[name])
+        self.manifest['stages'][stage] = {'input_hash': key, 'inputs': list(inputs), 'outputs': list(outputs)}
+        self._save_manifest()
+        return True
+
+
+def file_hash(paths):
+    """Content hash over a set of input files (e.g. the conversation traces)."""
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            h.update(content_hash(f.read()).encode())
+    return h.hexdigest()
+
+
+# --- Stages ---
+
+def tvd_stage(R):
+    """Pairwise TVD-MI, per-agent welfare w_i and overall welfare W."""
+    packed, Q = pack_responses(R)
+    _, tvd = condensed_distances(packed, Q)
+    n = packed.shape[0]
+    i, j = np.triu_indices(n, k=1)
+    sums = np.bincount(i, weights=tvd, minlength=n) + np.bincount(j, weights=tvd, minlength=n)
+    return {'TVD': tvd, 'W_i': sums / (n - 1), 'W_all': float(tvd.mean())}
+
+
+def report_stage(R, aids, QN, W_i, W_all):
+    """Render the welfare table and automatic clustering into a text report."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Q, Ns = R.shape
+        print("## 6. Agent Welfare Scores\n")
+        print(f"  {'Agent':<14s}  w_i     Sum(yes)  Profile")
+        print("  " + "-" * 60)
+        for idx in np.argsort(-W_i, kind='stable'):
+            profile = "".join(str(int(x)) for x in R[:, idx])
+            print(f"  {aids[idx]:<14s}  {W_i[idx]:.4f}  {int(R[:, idx].sum()):>3d}/{Q}    {profile}")
+        print(f"\n## 7. Overall Welfare\n")
+        print(f"  W = {W_all:.4f}")
+        print(f"  (Mean pairwise TVD-MI across all {Ns * (Ns - 1) // 2} pairs)\n")
+        print_clusters(cluster_agents(R), aids, QN)
+    return {'report': out.getvalue()}
+
+
+def import_pickle(pkl_path, store):
+    """Migrate a legacy `_data.pkl` into the store as the extract/query/matrix outputs."""
+    with open(pkl_path, 'rb') as f:
+        D = pickle.load(f)
+    agent_ids = {s['filename']: s.get('agent_id') for s in D['successes']}
+    traces = [dict(t, agent_id=agent_ids.get(t['filename'])) for t in D['traces']]
+    source = {'source': file_hash([pkl_path])}
+    store.run_stage('extract', [], ['traces'], lambda: {'traces': traces}, params=source)
+    store.run_stage('query', [], ['QN'], lambda: {'QN': D['QN']}, params=source)
+    store.run_stage('matrix', ['traces', 'QN'], ['R', 'aids'],
+                    lambda *_: {'R': D['R'], 'aids': D['aids']}, params=source)
+
+
+def run_analysis(store):
+    """Run the downstream stages; each is skipped when its inputs are unchanged."""
+    ran = {}
+    ran['tvd'] = store.run_stage('tvd', ['R'], ['TVD', 'W_i', 'W_all'], tvd_stage)
+    ran['report'] = store.run_stage('report', ['R', 'aids', 'QN', 'W_i', 'W_all'], ['report'], report_stage)
+    return ran
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help='Migrate a _data.pkl into a store')
+    p_import.add_argument('pickle')
+    p_import.add_argument('store')
+    p_run = sub.add_parser('run', help='Run the tvd and report stages')
+    p_run.add_argument('store')
+    p_info = sub.add_parser('info', help='List artifacts and stage hashes')
+    p_info.add_argument('store')
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store)
+    if args.command == 'import':
+        import_pickle(args.pickle, store)
+        run_analysis(store)
+        total = sum(a['bytes'] for a in store.manifest['artifacts'].values())
+        print(f"Imported {args.pickle} -> {args.store} ({total:,} bytes, "
+              f"pickle was {os.path.getsize(args.pickle):,} bytes)")
+    elif args.command == 'run':
+        for stage, ran in run_analysis(store).items():
+            print(f"  {stage:<8s} {'ran' if ran else 'up to date'}")
+        print(store.get('report'))
+    else:
+        print(f"Schema version {store.manifest['schema_version']}")
+        for name, a in sorted(store.manifest['artifacts'].items()):
+            print(f"  {name:<8s} {a['kind']:<10s} {a['bytes']:>9,} bytes  {a['sha256'][:12]}")
+        for stage, s in store.manifest['stages'].items():
+            print(f"  stage {stage:<8s} inputs={','.join(s['inputs']) or '-'}  {s['input_hash'][:12]}")